@@ -1,103 +1,261 @@
 import os
 from datetime import datetime
-from flask import Flask, render_template, request, send_file, jsonify, session
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from flask import Flask, render_template, stream_template, request, send_file, jsonify, session, g, has_request_context
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import SQLAlchemyError
-import pandas as pd
-import io
-import smtplib
-from email.message import EmailMessage
 from config import settings
 from dt_fmt import dt_fmt
+from resultset import ResultSet, cursor_description, to_csv_gzip, to_html_table, to_xlsx_bytes, write_xlsx
 import json
 import logging
+import re
+import threading
+
+# XlsxWriter, smtplib and the email package are imported inside the functions that need
+# them (export / email). Keeping them off the import path makes worker boot and
+# `gunicorn --preload` noticeably faster since most requests never touch them.
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'change_this_secret_key')
 
-# Load DB config from JSON
-with open(os.path.join(os.path.dirname(__file__), 'db_config.json')) as f:
-    DB_CONFIG = json.load(f)
-
+BASE_DIR = os.path.dirname(__file__)
+DB_CONFIG_PATH = os.path.join(BASE_DIR, 'db_config.json')
 # Optional deploy-time overrides. If `deploy_config.json` exists in the repo root it may
 # supply `db_overrides` (map of db_key -> connection_string), `smtp`, and `site` settings.
-DEPLOY_CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'deploy_config.json')
-DEPLOY_CONFIG = {}
+DEPLOY_CONFIG_PATH = os.path.join(BASE_DIR, 'deploy_config.json')
+# Shared reload counter. `/__reload_config` bumps it (under a file lock); every worker compares it
+# (together with the mtimes of the two config files) at most every CONFIG_CHECK_INTERVAL seconds and
+# swaps in a fresh snapshot when anything changed. A snapshot's version is "<counter>-<content hash>",
+# so an edit picked up without a reload still gets a new version, and workers that loaded the same
+# files report the same one.
+CONFIG_VERSION_PATH = os.environ.get('CONFIG_VERSION_PATH', os.path.join(BASE_DIR, 'logs', '.config_version'))
+CONFIG_CHECK_INTERVAL = float(os.environ.get('CONFIG_CHECK_INTERVAL', '2'))
 
 
-def load_deploy_config():
-    """Read deploy_config.json (if present) and merge overrides into runtime config.
-    Returns the loaded deploy config (dict) or {}.
-    """
-    global DEPLOY_CONFIG, DB_CONFIG, SMTP_SETTINGS, SITE_CONFIG
-    if not os.path.exists(DEPLOY_CONFIG_PATH):
-        return {}
-    try:
-        with open(DEPLOY_CONFIG_PATH) as df:
-            loaded = json.load(df)
-            DEPLOY_CONFIG = loaded or {}
-            # Merge DB overrides
-            for k, v in (DEPLOY_CONFIG.get('db_overrides') or {}).items():
-                if k in DB_CONFIG and v:
-                    DB_CONFIG[k]['connection_string'] = v
-            # Update SMTP settings
-            smtp_cfg = DEPLOY_CONFIG.get('smtp') or {}
-            if smtp_cfg:
-                SMTP_SETTINGS.update({
-                    'host': smtp_cfg.get('host') or SMTP_SETTINGS.get('host'),
-                    'port': smtp_cfg.get('port') or SMTP_SETTINGS.get('port'),
-                    'user': smtp_cfg.get('user') or SMTP_SETTINGS.get('user'),
-                    'password': smtp_cfg.get('password') or SMTP_SETTINGS.get('password'),
-                    'use_tls': smtp_cfg.get('use_tls', SMTP_SETTINGS.get('use_tls', True)),
-                    'from': smtp_cfg.get('from') or SMTP_SETTINGS.get('from'),
-                })
-            # Update SITE_CONFIG if present
-            site_cfg = DEPLOY_CONFIG.get('site') or {}
-            if site_cfg:
-                SITE_CONFIG.update(site_cfg)
-            return DEPLOY_CONFIG
-    except Exception as e:
-        logging.warning(f'Failed to load deploy_config.json: {e}')
-        return {}
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    """Plain dict/list copy of a frozen mapping (for JSON responses)."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
 
 
-# Try load once at startup
-_ = load_deploy_config()
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of db_config.json + deploy_config.json + environment defaults.
+    A request reads one snapshot for its whole lifetime (see `current_config()`), so a reload can
+    never be observed half-applied.
+    """
+    version: str
+    stamp: tuple
+    db_config: Mapping
+    deploy: Mapping
+    smtp: Mapping
+    site: Mapping
+    applications: tuple
+    app_key_map: Mapping
+
+    def with_sources(self, sources):
+        """Copy of this snapshot with `sources` (db key -> entry) added or replaced."""
+        db_config = {**_thaw(self.db_config), **sources}
+        return _make_snapshot(db_config, _thaw(self.deploy), self.version, self.stamp, expand=False)
 
 
-def _expand_env_placeholders_in_db_config():
-    """Replace ${VAR} placeholders in DB_CONFIG connection_string entries with env vars.
+def _expand_env_placeholders(db_config):
+    """Replace ${VAR} placeholders in connection_string entries with env vars.
     This allows storing an env-var token in `db_config.json` (e.g. "${DB_URI_B2C_FE}") while
     keeping real credentials out of source control.
     """
-    for k, v in DB_CONFIG.items():
+    for k, v in db_config.items():
         conn = v.get('connection_string')
         if isinstance(conn, str) and conn.startswith('${') and conn.endswith('}'):
             env_name = conn[2:-1]
             env_val = os.environ.get(env_name)
             if env_val:
-                DB_CONFIG[k]['connection_string'] = env_val
+                v['connection_string'] = env_val
             else:
                 # Fallback: try a local sqlite file under ./db/<key>.db for dev convenience
-                local_path = os.path.join(os.path.dirname(__file__), 'db', f"{k}.db")
+                local_path = os.path.join(BASE_DIR, 'db', f"{k}.db")
                 if os.path.exists(local_path):
-                    DB_CONFIG[k]['connection_string'] = f"sqlite:///{local_path}"
+                    v['connection_string'] = f"sqlite:///{local_path}"
                     logging.info(f'Falling back to local SQLite for {k}: {local_path}')
                 else:
                     logging.warning(f'Environment variable {env_name} not set and no local DB found; leaving placeholder for {k}')
 
 
-# Expand any ${VAR} placeholders from environment variables
-_expand_env_placeholders_in_db_config()
+def _make_snapshot(db_config, deploy, version, stamp, expand=True):
+    db_config = {k: dict(v) for k, v in db_config.items()}
+    # Merge DB overrides
+    for k, v in (deploy.get('db_overrides') or {}).items():
+        if k in db_config and v:
+            db_config[k]['connection_string'] = v
+    if expand:
+        _expand_env_placeholders(db_config)
+
+    # SMTP settings resolved from deploy config or environment variables
+    smtp = dict(deploy.get('smtp') or {})
+    smtp.setdefault('host', os.environ.get('SMTP_HOST'))
+    smtp.setdefault('port', int(os.environ.get('SMTP_PORT', '0')) or None)
+    smtp.setdefault('user', os.environ.get('SMTP_USER'))
+    smtp.setdefault('password', os.environ.get('SMTP_PASS'))
+    smtp.setdefault('use_tls', os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes'))
+    smtp.setdefault('from', os.environ.get('SMTP_FROM') or os.environ.get('EMAIL_FROM') or 'noreply@example.com')
+
+    # Site-level settings exposed to templates. These may come from deploy_config.json (key: "site")
+    # or via environment variables. Example deploy_config.json:
+    # { "site": { "title": "My Logs", "logo": "/static/img/my-logo.png", "logo_alt": "My Logo" } }
+    site = dict(deploy.get('site') or {})
+    site.setdefault('title', os.environ.get('SITE_TITLE', 'Etisalat Application Logs Portal'))
+    # `logo` may be an absolute or relative URL. If not provided, templates will fall back to the default static image.
+    site.setdefault('logo', os.environ.get('SITE_LOGO'))
+    site.setdefault('logo_alt', os.environ.get('SITE_LOGO_ALT', 'Logo'))
+
+    return ConfigSnapshot(
+        version=version,
+        stamp=stamp,
+        db_config=_freeze(db_config),
+        deploy=_freeze(deploy),
+        smtp=_freeze(smtp),
+        site=_freeze(site),
+        applications=tuple(v['display_name'] for v in db_config.values()),
+        app_key_map=MappingProxyType({v['display_name']: k for k, v in db_config.items()}),
+    )
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_config_version():
+    try:
+        with open(CONFIG_VERSION_PATH) as vf:
+            return int(vf.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _config_stamp():
+    return (_mtime_ns(DB_CONFIG_PATH), _mtime_ns(DEPLOY_CONFIG_PATH), _read_config_version())
 
 
-# Optional fail-fast behavior: if any DB_CONFIG connection_string still contains
-# an unresolved ${VAR} placeholder and the env var FAIL_ON_UNRESOLVED_DB_PLACEHOLDERS
-# is set to a truthy value, raise RuntimeError to avoid starting with missing credentials.
+def load_config_snapshot():
+    """Read both config files and build a new snapshot. Raises on unreadable/invalid JSON so a
+    bad edit never replaces a working configuration.
+    """
+    import hashlib
+    stamp = _config_stamp()
+    with open(DB_CONFIG_PATH, 'rb') as f:
+        db_raw = f.read()
+    deploy_raw = b''
+    if os.path.exists(DEPLOY_CONFIG_PATH):
+        with open(DEPLOY_CONFIG_PATH, 'rb') as df:
+            deploy_raw = df.read()
+    db_config = json.loads(db_raw)
+    deploy = (json.loads(deploy_raw) if deploy_raw else None) or {}
+    digest = hashlib.sha256(db_raw + b'\0' + deploy_raw).hexdigest()[:10]
+    return _make_snapshot(db_config, deploy, f'{stamp[2]}-{digest}', stamp)
+
+
+@contextmanager
+def _config_version_lock():
+    """Exclusive lock (across processes) held around the reload counter's read-increment-write.
+    Closing the lock file releases it.
+    """
+    with open(f'{CONFIG_VERSION_PATH}.lock', 'a+') as lf:
+        try:
+            import fcntl
+            fcntl.flock(lf, fcntl.LOCK_EX)
+        except ImportError:
+            # Windows: lock the first byte; LK_LOCK retries for ~10 s before raising
+            import msvcrt
+            lf.seek(0)
+            msvcrt.locking(lf.fileno(), msvcrt.LK_LOCK, 1)
+        yield
+
+
+def bump_config_version():
+    """Increment the shared reload counter so every worker picks up a new snapshot.
+    Returns the new counter value.
+    """
+    os.makedirs(os.path.dirname(CONFIG_VERSION_PATH), exist_ok=True)
+    with _config_version_lock():
+        version = _read_config_version() + 1
+        tmp = f'{CONFIG_VERSION_PATH}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as vf:
+            vf.write(str(version))
+        os.replace(tmp, CONFIG_VERSION_PATH)
+    return version
+
+
+_CONFIG = load_config_snapshot()
+_CONFIG_CHECKED_AT = 0.0
+_CONFIG_LOCK = threading.Lock()
+
+
+def current_config():
+    """The snapshot for the current request (pinned in `before_request`), else the latest one."""
+    if has_request_context() and 'config' in g:
+        return g.config
+    return _CONFIG
+
+
+def refresh_config(force=False):
+    """Swap in a new snapshot if the config files or the reload counter changed.
+    Stat calls are rate-limited to one per CONFIG_CHECK_INTERVAL; `force` skips both checks.
+    """
+    global _CONFIG, _CONFIG_CHECKED_AT
+    from time import monotonic
+    if not force and monotonic() - _CONFIG_CHECKED_AT < CONFIG_CHECK_INTERVAL:
+        return _CONFIG
+    with _CONFIG_LOCK:
+        _CONFIG_CHECKED_AT = monotonic()
+        if not force and _config_stamp() == _CONFIG.stamp:
+            return _CONFIG
+        try:
+            snapshot = load_config_snapshot()
+        except Exception as e:
+            logging.warning(f'Config reload failed; keeping version {_CONFIG.version}: {e}')
+            return _CONFIG
+        previous, _CONFIG = _CONFIG, snapshot
+    logging.info(f'Config snapshot {previous.version} -> {snapshot.version} (pid {os.getpid()})')
+    _prune_engines(snapshot)
+    return snapshot
+
+
+def __getattr__(name):
+    # Read-only access for tools/tests that still use the old module globals.
+    legacy = {
+        'DB_CONFIG': 'db_config', 'DEPLOY_CONFIG': 'deploy', 'SMTP_SETTINGS': 'smtp',
+        'SITE_CONFIG': 'site', 'APPLICATIONS': 'applications', 'APP_KEY_MAP': 'app_key_map',
+    }
+    if name in legacy:
+        return getattr(current_config(), legacy[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Optional fail-fast behavior: if any connection_string still contains an unresolved ${VAR}
+# placeholder and the env var FAIL_ON_UNRESOLVED_DB_PLACEHOLDERS is set to a truthy value,
+# raise RuntimeError to avoid starting with missing credentials.
 def _fail_on_unresolved_placeholders():
     if os.environ.get('FAIL_ON_UNRESOLVED_DB_PLACEHOLDERS', 'false').lower() in ('1', 'true', 'yes'):
         unresolved = []
-        for k, v in DB_CONFIG.items():
+        for k, v in _CONFIG.db_config.items():
             conn = v.get('connection_string')
             if isinstance(conn, str) and conn.startswith('${') and conn.endswith('}'):
                 unresolved.append((k, conn))
@@ -107,35 +265,46 @@ def _fail_on_unresolved_placeholders():
 
 _fail_on_unresolved_placeholders()
 
-# SMTP settings resolved from deploy config or environment variables
-SMTP_SETTINGS = DEPLOY_CONFIG.get('smtp', {}) if DEPLOY_CONFIG else {}
-SMTP_SETTINGS.setdefault('host', os.environ.get('SMTP_HOST'))
-SMTP_SETTINGS.setdefault('port', int(os.environ.get('SMTP_PORT', '0')) or None)
-SMTP_SETTINGS.setdefault('user', os.environ.get('SMTP_USER'))
-SMTP_SETTINGS.setdefault('password', os.environ.get('SMTP_PASS'))
-SMTP_SETTINGS.setdefault('use_tls', os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes'))
-SMTP_SETTINGS.setdefault('from', os.environ.get('SMTP_FROM') or os.environ.get('EMAIL_FROM') or 'noreply@example.com')
-
-# Site-level settings exposed to templates. These may come from deploy_config.json (key: "site")
-# or via environment variables. Example deploy_config.json:
-# { "site": { "title": "My Logs", "logo": "/static/img/my-logo.png", "logo_alt": "My Logo" } }
-SITE_CONFIG = DEPLOY_CONFIG.get('site', {}) if DEPLOY_CONFIG else {}
-SITE_CONFIG.setdefault('title', os.environ.get('SITE_TITLE', 'Etisalat Application Logs Portal'))
-# `logo` may be an absolute or relative URL. If not provided, templates will fall back to the default static image.
-SITE_CONFIG.setdefault('logo', os.environ.get('SITE_LOGO'))
-SITE_CONFIG.setdefault('logo_alt', os.environ.get('SITE_LOGO_ALT', 'Logo'))
+# Limits for "Send Selected Logs". Selections up to EMAIL_INLINE_MAX_ROWS are inlined as an
+# HTML table; larger ones go out as a compressed attachment capped at EMAIL_ATTACHMENT_MAX_BYTES.
+EMAIL_MAX_SELECTED_ROWS = int(os.environ.get('EMAIL_MAX_SELECTED_ROWS', '5000'))
+EMAIL_INLINE_MAX_ROWS = int(os.environ.get('EMAIL_INLINE_MAX_ROWS', '50'))
+EMAIL_ATTACHMENT_MAX_BYTES = int(os.environ.get('EMAIL_ATTACHMENT_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Time-sliced execution for large windows. A query over more than QUERY_SLICE_MIN_WINDOW_MINUTES
+# (0 disables slicing) is run newest-first, starting with a QUERY_SLICE_INITIAL_MINUTES slice and
+# stopping as soon as `limit` rows are found. QUERY_SLICE_PARALLEL > 1 runs slices concurrently.
+QUERY_SLICE_MIN_WINDOW_MINUTES = int(os.environ.get('QUERY_SLICE_MIN_WINDOW_MINUTES', '360'))
+QUERY_SLICE_INITIAL_MINUTES = float(os.environ.get('QUERY_SLICE_INITIAL_MINUTES', '60'))
+QUERY_SLICE_PARALLEL = max(1, int(os.environ.get('QUERY_SLICE_PARALLEL', '1')))
+
+# Columnar exports (/export with format=parquet|arrow) need the optional pyarrow package and
+# are written EXPORT_BATCH_ROWS rows at a time from a server-side cursor.
+COLUMNAR_EXPORT_FORMATS = {
+    'parquet': ('error_logs.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('error_logs.arrow', 'application/vnd.apache.arrow.file'),
+}
+EXPORT_BATCH_ROWS = int(os.environ.get('EXPORT_BATCH_ROWS', '5000'))
+# Arrow IPC is uncompressed by default so it can be memory-mapped as-is; 'lz4' or 'zstd' shrink it.
+ARROW_IPC_COMPRESSION = os.environ.get('ARROW_IPC_COMPRESSION') or None
+
+# When > 0, text/CLOB cells on the results page are truncated to this many characters.
+# Export and email always use the full values.
+RESULT_PREVIEW_CHARS = int(os.environ.get('RESULT_PREVIEW_CHARS', '0'))
 
 
 def _reload_token():
     # Token may be provided via env var or in deploy config under key 'reload_token'
-    return os.environ.get('RELOAD_TOKEN') or DEPLOY_CONFIG.get('reload_token')
+    return os.environ.get('RELOAD_TOKEN') or current_config().deploy.get('reload_token')
 
 
 @app.route('/__reload_config', methods=['POST'])
 def reload_config():
-    """Protected endpoint to reload `deploy_config.json` from disk and update runtime config.
+    """Protected endpoint to reload config from disk and publish it to every worker.
     To call, set header `X-Reload-Token: <token>` or send `?token=<token>`. Token must match
     environment variable `RELOAD_TOKEN` or `reload_token` inside `deploy_config.json`.
+    This worker switches immediately; the others follow within CONFIG_CHECK_INTERVAL seconds
+    via the shared version counter.
     """
     token = request.headers.get('X-Reload-Token') or request.args.get('token')
     expected = _reload_token()
@@ -143,11 +312,12 @@ def reload_config():
         return jsonify({'error': 'Reload token not configured on server'}), 403
     if not token or token != expected:
         return jsonify({'error': 'Invalid reload token'}), 403
-    loaded = load_deploy_config()
-    return jsonify({'reloaded': True, 'site': SITE_CONFIG, 'smtp': SMTP_SETTINGS, 'db_overrides': loaded.get('db_overrides')}), 200
-
-APPLICATIONS = [v['display_name'] for v in DB_CONFIG.values()]
-APP_KEY_MAP = {v['display_name']: k for k, v in DB_CONFIG.items()}
+    counter = bump_config_version()
+    cfg = refresh_config(force=True)
+    if cfg.stamp[2] < counter:
+        return jsonify({'error': 'Config reload failed; previous configuration kept', 'version': cfg.version}), 500
+    return jsonify({'reloaded': True, 'version': cfg.version, 'site': _thaw(cfg.site), 'smtp': _thaw(cfg.smtp),
+                    'db_overrides': _thaw(cfg.deploy.get('db_overrides'))}), 200
 
 BASE_QUERY = """
 SELECT * FROM logs
@@ -175,6 +345,8 @@ from time import time
 @app.before_request
 def _before_request_log():
     request._start_time = time()
+    # Pin one config snapshot for the whole request
+    g.config = refresh_config()
     logging.info(f"REQ start {request.remote_addr} {request.method} {request.path} params={request.args.to_dict()} form={request.form.to_dict()}")
 
 @app.after_request
@@ -186,6 +358,129 @@ def _after_request_log(response):
     return response
 
 
+# Response delivery: per-response gzip/brotli negotiation, streamed rendering for large result
+# pages and content-hashed static URLs.
+# - Responses of a compressible type get Content-Encoding `br` (when the optional `brotli` package
+#   is installed) or `gzip`, chosen from the client's Accept-Encoding. Buffered responses are only
+#   compressed from COMPRESS_MIN_BYTES up; streamed ones are compressed chunk by chunk with a sync
+#   flush so the browser can render the first rows while the rest are still being generated.
+# - /query streams the page once a result has STREAM_MIN_ROWS rows or more.
+# - url_for('static', ...) appends `?v=<content hash>`; such URLs are served with a one-year
+#   immutable Cache-Control, so editing the file changes the URL instead of waiting for caches.
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_ENABLED = os.environ.get('COMPRESS_RESPONSES', 'true').lower() in ('1', 'true', 'yes')
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+STREAM_MIN_ROWS = int(os.environ.get('STREAM_MIN_ROWS', '200'))
+STREAM_CHUNK_BYTES = int(os.environ.get('STREAM_CHUNK_BYTES', str(64 * 1024)))
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', str(365 * 24 * 3600)))
+
+try:
+    # Optional; resolved once here so requests never retry a failed import
+    import brotli as _brotli
+except ImportError:
+    _brotli = None
+
+_COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+_STATIC_HASHES = {}
+
+
+def _negotiate_encoding():
+    offered = ['br', 'gzip'] if _brotli else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def _compress_stream(chunks, encoding):
+    """Compress an iterable of byte chunks, flushing after each so every chunk reaches the client."""
+    if encoding == 'br':
+        compressor = _brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+        return
+    import zlib
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _buffered(chunks, size):
+    """Join small template chunks into ~`size`-byte pieces so each flush carries a useful amount."""
+    parts, pending = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        pending += len(chunk)
+        if pending >= size:
+            yield ''.join(parts)
+            parts, pending = [], 0
+    if parts:
+        yield ''.join(parts)
+
+
+def _static_hash(filename):
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _STATIC_HASHES.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    import hashlib
+    with open(path, 'rb') as sf:
+        digest = hashlib.sha256(sf.read()).hexdigest()[:12]
+    _STATIC_HASHES[filename] = (mtime, digest)
+    return digest
+
+
+@app.url_defaults
+def _hashed_static_urls(endpoint, values):
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        digest = _static_hash(values['filename'])
+        if digest:
+            values['v'] = digest
+
+
+@app.after_request
+def _deliver_response(response):
+    if request.endpoint == 'static' and response.status_code in (200, 304) and request.args.get('v') \
+            and request.args['v'] == _static_hash(request.view_args.get('filename', '')):
+        # Only the current content hash is immutable; a stale or made-up `v` gets normal caching
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+    if not COMPRESS_ENABLED or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if response.status_code in (204, 304) or not (response.mimetype or '').startswith(_COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if not encoding:
+        return response
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_BYTES:
+            return response
+        if encoding == 'br':
+            compressed = _brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            import gzip
+            compressed = gzip.compress(data, compresslevel=GZIP_LEVEL)
+        response.set_data(compressed)
+        response.headers['X-Uncompressed-Length'] = str(len(data))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
 from werkzeug.exceptions import HTTPException
 
 
@@ -203,7 +498,7 @@ def _handle_exception(e):
             return jsonify({'error': message}), e.code
         else:
             # Render the main UI with a friendly error message and preserve HTTP status
-            return render_template('index.html', applications=APPLICATIONS, results={'error': message}, selected=None, site=SITE_CONFIG), e.code
+            return render_template('index.html', applications=current_config().applications, results={'error': message}, selected=None, site=current_config().site), e.code
 
     # Non-HTTP exceptions: log full stack trace for diagnostics but hide details from end users
     logging.exception(f"Unhandled exception during request {request.remote_addr} {request.method} {request.path}")
@@ -211,10 +506,86 @@ def _handle_exception(e):
     if request.is_json or request.path.startswith('/send_selected_logs'):
         return jsonify({'error': friendly}), 500
     else:
-        return render_template('index.html', applications=APPLICATIONS, results={'error': friendly}, selected=None, site=SITE_CONFIG), 500
+        return render_template('index.html', applications=current_config().applications, results={'error': friendly}, selected=None, site=current_config().site), 500
+
+# Engines are cached per connection URI so pooled connections are reused across requests.
+# The cache is per-process: under `gunicorn --preload` the master imports the app (and parses
+# config) once, and each forked worker lazily builds its own engines on first use. Engines
+# inherited across a fork are dropped without closing the parent's connections.
+_ENGINES = {}
+_ENGINES_PID = os.getpid()
+_ENGINES_LOCK = threading.Lock()
+# Unpooled engines used only by the /healthz connect probe (see `_probe_engine`)
+_PROBE_ENGINES = {}
+
+
+def _dispose_engines_after_fork():
+    """Forget engines inherited from a parent process. Safe to call from gunicorn's `post_fork`."""
+    global _ENGINES_PID, _ENGINES_LOCK
+    # A lock copied across fork may be held by a thread that no longer exists in the child
+    _ENGINES_LOCK = threading.Lock()
+    for engine in list(_ENGINES.values()):
+        # close=False: leave the parent's sockets alone, just drop the pool in this process
+        engine.dispose(close=False)
+    _ENGINES.clear()
+    _ENGINES_PID = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def _prune_engines(snapshot):
+    """Dispose cached engines whose URI is no longer used by any source in `snapshot`.
+    Engines for unchanged URIs (and their warm pools) are kept.
+    """
+    live = {_resolve_connection_string(info, key) for key, info in snapshot.db_config.items()}
+    with _ENGINES_LOCK:
+        stale = [uri for uri in _ENGINES if uri not in live]
+        engines = [_ENGINES.pop(uri) for uri in stale]
+    for engine in engines:
+        engine.dispose()
+    for uri in [u for u in _PROBE_ENGINES if u not in live]:
+        _PROBE_ENGINES.pop(uri, None)
+    if stale:
+        logging.info(f'Disposed {len(stale)} engine(s) for connection strings no longer configured')
+
+
+# Driver keyword for a TCP connect timeout, so an unreachable host fails within DB_CONNECT_TIMEOUT
+# seconds instead of the OS default. cx_Oracle has none; put (CONNECT_TIMEOUT=n) in its DSN instead.
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '10'))
+_CONNECT_TIMEOUT_ARGS = {
+    'oracle+oracledb': 'tcp_connect_timeout',
+    'mysql+pymysql': 'connect_timeout',
+    'mysql+mysqldb': 'connect_timeout',
+    'mariadb+pymysql': 'connect_timeout',
+    'postgresql': 'connect_timeout',
+    'postgresql+psycopg2': 'connect_timeout',
+    'mssql+pyodbc': 'timeout',
+}
+
+
+def _connect_args(uri):
+    from sqlalchemy.engine import make_url
+    try:
+        driver = make_url(uri).drivername
+    except Exception:
+        return {}
+    key = _CONNECT_TIMEOUT_ARGS.get(driver)
+    return {key: DB_CONNECT_TIMEOUT} if key and DB_CONNECT_TIMEOUT > 0 else {}
+
 
 def _get_engine(uri: str):
-    return create_engine(uri, pool_pre_ping=True, future=True)
+    if _ENGINES_PID != os.getpid():
+        _dispose_engines_after_fork()
+    engine = _ENGINES.get(uri)
+    if engine is None:
+        with _ENGINES_LOCK:
+            engine = _ENGINES.get(uri)
+            if engine is None:
+                engine = create_engine(uri, pool_pre_ping=True, future=True, connect_args=_connect_args(uri))
+                _ENGINES[uri] = engine
+    return engine
 
 
 def _resolve_connection_string(db_info: dict, app_key: str) -> str:
@@ -238,49 +609,245 @@ def _resolve_connection_string(db_info: dict, app_key: str) -> str:
         return conn
     return conn
 
-def query_logs(app_name, jsession_id, start_dt, end_dt, limit):
+def _source_info(app_name):
+    """(config key, db_config entry or None) for a display name, from the current snapshot."""
+    cfg = current_config()
     # Map display name to config key
-    app_key = APP_KEY_MAP.get(app_name, app_name)
-    db_info = DB_CONFIG.get(app_key)
+    app_key = cfg.app_key_map.get(app_name, app_name)
+    return app_key, cfg.db_config.get(app_key)
+
+
+def _query_params(app_key, db_info, jsession_id, start_dt, end_dt, limit):
+    """Bind parameters for a source's select_query."""
+    dt_fmt2 = '%Y-%m-%d %H:%M:%S'
+    # Use named-parameter binding by default. If the SQL contains a LIKE :jsid
+    # clause and a jsession_id is provided, wrap it with '%' for pattern match.
+    params = {
+        'app_name': app_key,
+        'start_time': start_dt.strftime(dt_fmt2),
+        'end_time': end_dt.strftime(dt_fmt2),
+        'jsid': jsession_id if jsession_id else None,
+        'limit': limit,
+        'backend_system': None,
+        'channel': None,
+        'sc_transaction_id': None,
+        'transaction_id': None,
+    }
+
+    # Auto-wrap jsid for LIKE queries (Oracle FE entries typically use LIKE)
+    sql_lower = db_info['select_query'].lower()
+    if 'like :jsid' in sql_lower and jsession_id:
+        params['jsid'] = f"%{jsession_id}%"
+    return params
+
+
+def _run_window(engine, app_key, db_info, jsession_id, start_dt, end_dt, max_rows):
+    """Execute the select_query for one time window, reading at most `max_rows` rows."""
+    with engine.connect() as conn:
+        params = _query_params(app_key, db_info, jsession_id, start_dt, end_dt, max_rows)
+        result = conn.execute(text(db_info['select_query']), params)
+        return ResultSet.from_cursor(result, max_rows=max_rows)
+
+
+# Column bound by `:start_time` in a select_query, and the column of a trailing ORDER BY ... DESC
+_TIME_COLUMN_RE = re.compile(r'([\w$#.]+)\s+BETWEEN\s+:start_time\b', re.IGNORECASE)
+_ORDER_DESC_RE = re.compile(r'\bORDER\s+BY\s+([\w$#.]+)\s+DESC\s*;?\s*$', re.IGNORECASE)
+# (config key, select_query) pairs whose rows have no id column; those are never sliced
+_NO_ID_QUERIES = set()
+
+
+def _same_column(a, b):
+    return a.rpartition('.')[2].lower() == b.rpartition('.')[2].lower()
+
+
+def _sliceable(app_key, db_info, start_dt, end_dt):
+    """Time slicing applies to newest-first queries over a large enough window. By default the
+    ORDER BY column must be the one `:start_time` filters on; concatenating time slices would
+    otherwise break the configured order (e.g. `ORDER BY id DESC`). An entry with
+    `"time_slicing": true` declares that its ORDER BY column increases with time (sequence ids),
+    so it is sliced by the time column and each slice keeps the configured ORDER BY.
+    """
+    opt_in = db_info.get('time_slicing')
+    if opt_in is False or QUERY_SLICE_MIN_WINDOW_MINUTES <= 0:
+        return False
+    sql = db_info['select_query']
+    time_m, order_m = _TIME_COLUMN_RE.search(sql), _ORDER_DESC_RE.search(sql)
+    if ':end_time' not in sql or not time_m or not order_m:
+        return False
+    if opt_in is not True and not _same_column(time_m.group(1), order_m.group(1)):
+        return False
+    if (app_key, sql) in _NO_ID_QUERIES:
+        return False
+    return (end_dt - start_dt).total_seconds() / 60 > QUERY_SLICE_MIN_WINDOW_MINUTES
+
+
+def _is_new(row, id_idx, seen):
+    try:
+        return row[id_idx] not in seen
+    except TypeError:
+        # unhashable id values: keep the row
+        return True
+
+
+def _mark_seen(row, id_idx, seen):
+    try:
+        seen.add(row[id_idx])
+    except TypeError:
+        pass
+
+
+def _query_sliced(engine, app_key, db_info, jsession_id, start_dt, end_dt, limit):
+    """Walk the window newest-first in time slices, stopping once `limit` rows are collected.
+    Each slice is sized from the row density seen so far (rows/minute) so the next one is
+    expected to fill what is still missing. With QUERY_SLICE_PARALLEL > 1 that many consecutive
+    slices run at once on separate pooled connections.
+    Adjacent slices share their boundary second (BETWEEN is inclusive), so rows are de-duplicated
+    by id column. Identical rows are legitimate (repeated errors in the same second), so a source
+    without an id column is not de-duplicated by value: the first slice reveals that and the
+    whole window is run unsliced instead.
+    """
+    from datetime import timedelta
+    from concurrent.futures import ThreadPoolExecutor
+    slice_minutes = float(QUERY_SLICE_INITIAL_MINUTES)
+    columns, rows, seen = (), [], set()
+    id_idx = None
+    cursor_end = end_dt
+    slices = scanned_minutes = 0
+    pool = ThreadPoolExecutor(max_workers=QUERY_SLICE_PARALLEL) if QUERY_SLICE_PARALLEL > 1 else None
+    try:
+        while cursor_end > start_dt and len(rows) < limit:
+            windows = []
+            for _ in range(QUERY_SLICE_PARALLEL if pool else 1):
+                if cursor_end <= start_dt:
+                    break
+                window_start = max(start_dt, cursor_end - timedelta(minutes=slice_minutes))
+                windows.append((window_start, cursor_end))
+                cursor_end = window_start
+            wanted = limit - len(rows)
+            run = lambda w: _run_window(engine, app_key, db_info, jsession_id, w[0], w[1], wanted)
+            batches = list(pool.map(run, windows)) if pool else [run(windows[0])]
+            fetched = 0
+            for (window_start, window_end), batch in zip(windows, batches):
+                slices += 1
+                scanned_minutes += (window_end - window_start).total_seconds() / 60
+                if not columns:
+                    columns = batch.columns
+                    id_idx = batch.index(_row_id_column(columns, db_info))
+                    if id_idx is None:
+                        _NO_ID_QUERIES.add((app_key, db_info['select_query']))
+                        logging.info(f'Sliced query {app_key}: no id column, running the window unsliced')
+                        return _run_window(engine, app_key, db_info, jsession_id, start_dt, end_dt, limit)
+                needed = limit - len(rows)
+                fresh = [r for r in batch.rows if _is_new(r, id_idx, seen)]
+                cap = wanted
+                # A capped batch that lost rows to de-duplication may hide rows we still need
+                while len(batch) >= cap and len(fresh) < needed:
+                    cap += len(batch) - len(fresh)
+                    batch = _run_window(engine, app_key, db_info, jsession_id, window_start, window_end, cap)
+                    fresh = [r for r in batch.rows if _is_new(r, id_idx, seen)]
+                for row in fresh[:needed]:
+                    _mark_seen(row, id_idx, seen)
+                    rows.append(row)
+                fetched += min(len(fresh), needed)
+                if len(rows) >= limit:
+                    break
+            # Adapt: size the next slice to what the observed density says is still missing
+            covered = sum((w[1] - w[0]).total_seconds() for w in windows) / 60
+            remaining = limit - len(rows)
+            if fetched:
+                target = remaining / (fetched / covered) * 1.25
+                slice_minutes = min(max(target, QUERY_SLICE_INITIAL_MINUTES / 4), slice_minutes * 8)
+            else:
+                slice_minutes *= 4
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
+    total_minutes = (end_dt - start_dt).total_seconds() / 60
+    logging.info(f'Sliced query {app_key}: {slices} slices, {len(rows)} rows, '
+                 f'scanned {scanned_minutes:.0f} of {total_minutes:.0f} minutes')
+    if not slices:
+        # Empty window: one unsliced call still returns the column names
+        return _run_window(engine, app_key, db_info, jsession_id, start_dt, end_dt, 1)
+    return ResultSet(columns, rows)
+
+
+def query_logs(app_name, jsession_id, start_dt, end_dt, limit):
+    """Run the configured select_query for `app_name` and return the newest `limit` rows as a
+    `ResultSet`. Large windows are executed in adaptive time slices (see `_query_sliced`).
+    """
+    app_key, db_info = _source_info(app_name)
     if not db_info:
-        return [], []
+        return ResultSet((), [])
     # Resolve connection string at call time to catch placeholders that may
     # not have been resolvable at startup (for example if DB files were created
     # after the app started).
     resolved_conn = _resolve_connection_string(db_info, app_key)
     engine = _get_engine(resolved_conn)
+    logging.debug(f"Query {app_key}: window {start_dt} .. {end_dt}, limit {limit}, jsession_id {jsession_id!r}")
+    if _sliceable(app_key, db_info, start_dt, end_dt):
+        return _query_sliced(engine, app_key, db_info, jsession_id, start_dt, end_dt, limit)
+    return _run_window(engine, app_key, db_info, jsession_id, start_dt, end_dt, limit)
+
+
+def iter_log_batches(app_name, jsession_id, start_dt, end_dt, limit, batch_size=5000):
+    """Like `query_logs()` but yields `ResultSet` batches of at most `batch_size` rows from a
+    server-side cursor, stopping after `limit` rows. Used by the columnar exports so the whole
+    result never has to sit in memory.
+    """
+    app_key, db_info = _source_info(app_name)
+    if not db_info:
+        return
+    engine = _get_engine(_resolve_connection_string(db_info, app_key))
     with engine.connect() as conn:
-        dt_fmt2 = '%Y-%m-%d %H:%M:%S'
-        # Use named-parameter binding by default. If the SQL contains a LIKE :jsid
-        # clause and a jsession_id is provided, wrap it with '%' for pattern match.
-        params = {
-            'app_name': app_key,
-            'start_time': start_dt.strftime(dt_fmt2),
-            'end_time': end_dt.strftime(dt_fmt2),
-            'jsid': jsession_id if jsession_id else None,
-            'limit': limit,
-            'backend_system': None,
-            'channel': None,
-            'sc_transaction_id': None,
-            'transaction_id': None,
-        }
+        params = _query_params(app_key, db_info, jsession_id, start_dt, end_dt, limit)
+        result = conn.execution_options(stream_results=True).execute(text(db_info['select_query']), params)
+        columns = tuple(result.keys())
+        description = cursor_description(result)
+        remaining = limit
+        while remaining > 0:
+            rows = result.fetchmany(min(batch_size, remaining))
+            if not rows:
+                break
+            remaining -= len(rows)
+            yield ResultSet(columns, [tuple(r) for r in rows], description)
+        result.close()
 
-        # Auto-wrap jsid for LIKE queries (Oracle FE entries typically use LIKE)
-        sql_lower = db_info['select_query'].lower()
-        if 'like :jsid' in sql_lower and jsession_id:
-            params['jsid'] = f"%{jsession_id}%"
 
-        print(f"[DEBUG] SQL: {db_info['select_query']}")
-        print(f"[DEBUG] Params: {params}")
-        result = conn.execute(text(db_info['select_query']), params)
-        columns = list(result.keys())
-        rows = [dict(zip(columns, r)) for r in result.fetchall()]
-    return rows, columns
+def _row_id_column(columns, db_info):
+    """Return the column used to identify rows for server-side selection, or None.
+    Uses `id_column` from the db_config entry when set, otherwise the first column named `id`.
+    Names are compared case-insensitively (SQLAlchemy lower-cases Oracle result keys, so a
+    configured `SC_ID` arrives as `sc_id`); the key is returned as it appears in `columns`.
+    """
+    configured = str((db_info or {}).get('id_column') or '').lower()
+    for wanted in filter(None, (configured, 'id')):
+        for col in columns:
+            if str(col).lower() == wanted:
+                return col
+    return None
+
+
+def _build_logs_attachment(rs, fmt):
+    """Serialize selected rows for an email attachment. Returns (filename, maintype, subtype, payload).
+    `csv` is gzip-compressed; `xlsx` is already a zip container.
+    """
+    if fmt == 'xlsx':
+        return 'selected_logs.xlsx', 'application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet', to_xlsx_bytes(rs)
+    return 'selected_logs.csv.gz', 'application', 'gzip', to_csv_gzip(rs)
+
 
-def send_logs_via_email(to_email, df, app_name=None):
-    # Convert DataFrame to HTML table with some Web 3 style
-    html_table = df.to_html(index=False, border=0, classes='web3-table', escape=False)
+def send_logs_via_email(to_email, rs, app_name=None, attachment=None):
+    """Email the selected rows. With `attachment` (the tuple returned by `_build_logs_attachment`)
+    the rows are attached instead of inlined as an HTML table.
+    """
+    import smtplib
+    from email.message import EmailMessage
     app_label = f" for {app_name}" if app_name else ""
+    if attachment:
+        html_table = f'<p>{len(rs)} rows are attached as <b>{attachment[0]}</b>.</p>'
+    else:
+        # HTML table with some Web 3 style
+        html_table = to_html_table(rs, 'web3-table')
     html_content = f'''
     <html>
     <head>
@@ -314,16 +881,20 @@ def send_logs_via_email(to_email, df, app_name=None):
     '''
     msg = EmailMessage()
     msg['Subject'] = f'Selected Error Logs{app_label}'
-    msg['From'] = SMTP_SETTINGS.get('from', 'noreply@example.com')
+    smtp = current_config().smtp
+    msg['From'] = smtp.get('from', 'noreply@example.com')
     msg['To'] = to_email
     msg.set_content(f'Please find the selected error logs{app_label} below.')
     msg.add_alternative(html_content, subtype='html')
+    if attachment:
+        filename, maintype, subtype, payload = attachment
+        msg.add_attachment(payload, maintype=maintype, subtype=subtype, filename=filename)
 
-    host = SMTP_SETTINGS.get('host')
-    port = SMTP_SETTINGS.get('port')
-    user = SMTP_SETTINGS.get('user')
-    password = SMTP_SETTINGS.get('password')
-    use_tls = SMTP_SETTINGS.get('use_tls', True)
+    host = smtp.get('host')
+    port = smtp.get('port')
+    user = smtp.get('user')
+    password = smtp.get('password')
+    use_tls = smtp.get('use_tls', True)
 
     if not host or not port:
         raise RuntimeError('SMTP host and port must be configured (deploy_config.json or SMTP_HOST/SMTP_PORT env vars)')
@@ -341,7 +912,7 @@ def send_logs_via_email(to_email, df, app_name=None):
 
 @app.route('/', methods=['GET'])
 def index():
-    return render_template('index.html', applications=APPLICATIONS, results=None, selected=None, site=SITE_CONFIG)
+    return render_template('index.html', applications=current_config().applications, results=None, selected=None, site=current_config().site)
 
 @app.route('/query', methods=['POST'])
 def query():
@@ -355,12 +926,12 @@ def query():
     try:
         limit = int(request.form.get('limit', '500'))
     except ValueError:
-        return render_template('index.html', applications=APPLICATIONS, results={'error': 'Invalid limit'}, selected=app_name, site=SITE_CONFIG)
+        return render_template('index.html', applications=current_config().applications, results={'error': 'Invalid limit'}, selected=app_name, site=current_config().site)
 
     logging.info(f"API Request: app_name={app_name}, jsession_id={jsession_id}, time_span={time_span}, limit={limit}")
 
     error = None
-    if not app_name or app_name not in APPLICATIONS:
+    if not app_name or app_name not in current_config().applications:
         error = 'Please select a valid application.'
 
     try:
@@ -377,27 +948,37 @@ def query():
         error = error or 'Please provide a valid time span.'
 
     if error:
-        return render_template('index.html', applications=APPLICATIONS, results={'error': error}, selected=app_name, site=SITE_CONFIG)
+        return render_template('index.html', applications=current_config().applications, results={'error': error}, selected=app_name, site=current_config().site)
 
     session['app_name'] = app_name  # Always update session with current app_name
     # pass extra filters along; query_logs uses named params so these will be bound when present
-    rows, columns = query_logs(app_name, jsession_id, start_dt, end_dt, limit)
-    logging.info(f"Query returned {len(rows)} rows. Columns: {columns}")
-    if not rows:
-        return render_template('index.html', applications=APPLICATIONS, results={'error': 'No data found.'}, selected=app_name, site=SITE_CONFIG)
+    rs = query_logs(app_name, jsession_id, start_dt, end_dt, limit)
+    logging.info(f"Query returned {len(rs)} rows. Columns: {list(rs.columns)}")
+    if not rs:
+        return render_template('index.html', applications=current_config().applications, results={'error': 'No data found.'}, selected=app_name, site=current_config().site)
 
     results = {
-        'columns': columns,
-        'rows': rows,
-        'count': len(rows),
+        'columns': rs.columns,
+        'rows': rs.previews(RESULT_PREVIEW_CHARS),
+        'count': len(rs),
         'app_name': app_name,
         'jsession_id': jsession_id,
         'start_time': start_dt.strftime('%Y-%m-%d %H:%M'),
         'end_time': end_dt.strftime('%Y-%m-%d %H:%M'),
+        # Exact window, posted back by "Send Selected Logs" so the server can re-fetch rows by id
+        'window_start': start_dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'window_end': end_dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'id_index': rs.index(_row_id_column(rs.columns, _source_info(app_name)[1])),
+        'level_index': rs.index('level'),
+        'limit': limit,
         'time_span': time_span
     }
     logging.info(f"API Response: {results['count']} rows from {results['start_time']} to {results['end_time']}")
-    return render_template('index.html', applications=APPLICATIONS, results=results, selected=app_name, site=SITE_CONFIG)
+    if results['count'] >= STREAM_MIN_ROWS:
+        # Large pages are streamed so the first rows arrive before the last one is rendered
+        page = stream_template('index.html', applications=current_config().applications, results=results, selected=app_name, site=current_config().site)
+        return app.response_class(_buffered(page, STREAM_CHUNK_BYTES), mimetype='text/html')
+    return render_template('index.html', applications=current_config().applications, results=results, selected=app_name, site=current_config().site)
 
 @app.route('/export', methods=['POST'])
 def export_excel():
@@ -416,33 +997,286 @@ def export_excel():
         start_dt = end_dt - timedelta(minutes=minutes)
     except Exception:
         return 'Invalid time span', 400
-    rows, columns = query_logs(app_name, jsession_id, start_dt, end_dt, limit)
-    if not rows:
+    export_format = (request.form.get('format') or 'xlsx').lower()
+    if export_format in COLUMNAR_EXPORT_FORMATS:
+        return _export_columnar(app_name, jsession_id, start_dt, end_dt, limit, export_format)
+    rs = query_logs(app_name, jsession_id, start_dt, end_dt, limit)
+    if not rs:
         return 'No data to export', 404
-    df = pd.DataFrame(rows)
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Logs')
+    import tempfile
+    # Written to a temp file rather than a BytesIO so a large export is never held in memory
+    output = tempfile.TemporaryFile()
+    write_xlsx(rs, output)
     output.seek(0)
     return send_file(output, download_name='error_logs.xlsx', as_attachment=True, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
 
+
+def _export_columnar(app_name, jsession_id, start_dt, end_dt, limit, export_format):
+    """Write Parquet / Arrow IPC incrementally from cursor batches into a temp file and send it."""
+    import tempfile
+    try:
+        from columnar_export import ColumnTypeDrift, write_columnar
+    except ImportError:
+        return 'Parquet/Arrow export requires the optional pyarrow package', 501
+    dictionary_columns = (_source_info(app_name)[1] or {}).get('dictionary_columns')
+    batches = iter_log_batches(app_name, jsession_id, start_dt, end_dt, limit, batch_size=EXPORT_BATCH_ROWS)
+    output = tempfile.TemporaryFile()
+    try:
+        rows = write_columnar(batches, output, export_format, dictionary_columns=dictionary_columns,
+                              ipc_compression=ARROW_IPC_COMPRESSION)
+    except ColumnTypeDrift as e:
+        output.close()
+        logging.warning(f'Columnar export for {app_name} failed: {e}')
+        return f'Cannot export as {export_format}: {e}. Use the Excel export instead.', 422
+    if not rows:
+        output.close()
+        return 'No data to export', 404
+    output.seek(0)
+    filename, mimetype = COLUMNAR_EXPORT_FORMATS[export_format]
+    return send_file(output, download_name=filename, as_attachment=True, mimetype=mimetype)
+
+
 @app.route('/send_selected_logs', methods=['POST'])
 def send_selected_logs():
-    data = request.get_json()
-    rows = data.get('rows')
+    """Email rows selected in the UI.
+    The client posts only row ids plus the query context (`application`, `jsession_id`,
+    `window_start`, `window_end`, `limit`); the rows are re-fetched here so CLOB bodies never
+    travel through the browser. A legacy `rows` payload (full row objects) is still accepted.
+    Selected ids that are not in the re-fetched rows are listed in the response as `missing`.
+    Known cost: the re-fetch runs the source's full select_query (CLOB columns included) for up to
+    min(`limit`, EMAIL_MAX_SELECTED_ROWS) rows and filters by id afterwards, however few ids were
+    selected.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
     email = data.get('email')
-    app_name = data.get('app_name')
+    ctx = data.get('context') or {}
+    ids = data.get('ids')
+    rows = data.get('rows')
+    malformed = (
+        not isinstance(ctx, dict)
+        or not isinstance(email or '', str)
+        or not isinstance(ids or [], list)
+        or not isinstance(rows or [], list)
+        or not all(isinstance(r, dict) for r in rows or [])
+    )
+    if malformed:
+        return jsonify({'error': 'Malformed request: ids/rows must be lists, context an object'}), 400
+    app_name = data.get('app_name') or ctx.get('application')
     if not app_name:
         app_name = session.get('app_name')
-    if not rows or not email:
+    if not email or not (ids or rows):
         return jsonify({'error': 'Missing rows or email'}), 400
-    df = pd.DataFrame(rows)
+    if len(ids or rows) > EMAIL_MAX_SELECTED_ROWS:
+        return jsonify({'error': f'Too many rows selected (max {EMAIL_MAX_SELECTED_ROWS})'}), 413
+
+    if ids:
+        try:
+            start_dt = datetime.strptime(ctx['window_start'], '%Y-%m-%d %H:%M:%S')
+            end_dt = datetime.strptime(ctx['window_end'], '%Y-%m-%d %H:%M:%S')
+            limit = min(int(ctx.get('limit') or EMAIL_MAX_SELECTED_ROWS), EMAIL_MAX_SELECTED_ROWS)
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Missing or invalid query context'}), 400
+        if app_name not in current_config().applications:
+            return jsonify({'error': 'Please select a valid application.'}), 400
+        fetched = query_logs(app_name, ctx.get('jsession_id') or None, start_dt, end_dt, limit)
+        id_idx = fetched.index(_row_id_column(fetched.columns, _source_info(app_name)[1]))
+        if id_idx is None:
+            return jsonify({'error': 'This source has no id column; selection by id is not supported'}), 400
+        wanted = {str(i) for i in ids}
+        rs = fetched.filter(lambda r: str(r[id_idx]) in wanted)
+        missing = sorted(wanted - {str(r[id_idx]) for r in rs.rows})
+        if not rs:
+            return jsonify({'error': 'Selected rows are no longer available', 'missing': missing}), 404
+    else:
+        rs = ResultSet.from_records(rows)
+        missing = []
+
+    attachment = None
+    fmt = (data.get('format') or 'csv').lower()
+    if len(rs) > EMAIL_INLINE_MAX_ROWS or data.get('format'):
+        attachment = _build_logs_attachment(rs, 'xlsx' if fmt == 'xlsx' else 'csv')
+        if len(attachment[3]) > EMAIL_ATTACHMENT_MAX_BYTES:
+            return jsonify({'error': f'Attachment is {len(attachment[3])} bytes, over the {EMAIL_ATTACHMENT_MAX_BYTES} byte limit. Select fewer rows.'}), 413
     try:
-        send_logs_via_email(email, df, app_name)
-        return jsonify({'success': True})
+        send_logs_via_email(email, rs, app_name, attachment=attachment)
+        # Rows that could not be re-fetched are reported, not silently left out of the mail
+        return jsonify({'success': True, 'rows': len(rs), 'attached': bool(attachment), 'missing': missing})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Health probes and pool warming.
+# `/healthz` reports pool checkout and `SELECT 1` latency for every db_config.json source. Results
+# are cached for HEALTH_CACHE_SECONDS so load balancers and dashboards can poll it cheaply; a
+# refresh gives up on sources that have not answered within HEALTH_PROBE_TIMEOUT seconds, and
+# callers arriving while one is running get the previous report instead of waiting. When
+# POOL_WARM_MIN > 0, a daemon thread in each worker keeps that many validated connections in
+# every source's pool (re-checked every POOL_WARM_INTERVAL seconds) and refreshes the health cache.
+HEALTH_CACHE_SECONDS = float(os.environ.get('HEALTH_CACHE_SECONDS', '15'))
+POOL_WARM_MIN = int(os.environ.get('POOL_WARM_MIN', '0'))
+POOL_WARM_INTERVAL = float(os.environ.get('POOL_WARM_INTERVAL', '60'))
+HEALTH_PROBE_TIMEOUT = float(os.environ.get('HEALTH_PROBE_TIMEOUT', '5'))
+
+_HEALTH_CACHE = {'at': 0.0, 'report': None}
+_HEALTH_LOCK = threading.Lock()
+_WARMER_PID = None
+_WARMER_LOCK = threading.Lock()
+
+
+def _is_placeholder(conn) -> bool:
+    return isinstance(conn, str) and conn.startswith('${') and conn.endswith('}')
+
+
+def _ping_sql(engine) -> str:
+    return 'SELECT 1 FROM DUAL' if engine.dialect.name == 'oracle' else 'SELECT 1'
+
+
+def _probe_engine(uri):
+    """Unpooled engine (NullPool) per URI, so every probe opens a real database connection."""
+    from sqlalchemy.pool import NullPool
+    engine = _PROBE_ENGINES.get(uri)
+    if engine is None:
+        engine = _PROBE_ENGINES.setdefault(uri, create_engine(uri, poolclass=NullPool, future=True,
+                                                              connect_args=_connect_args(uri)))
+    return engine
+
+
+def _probe_source(app_key, db_info):
+    """Time a fresh connect, a pool checkout and a `SELECT 1` for one source. Never raises.
+    `connect_ms` opens (and closes) a new connection outside the pool, so it is measured even
+    when the pool warmer keeps the pool full. `checkout_ms` is the time to get a connection
+    from the pool: a new connect when the pool is empty, otherwise the pre-ping of an idle one.
+    """
+    report = {'display_name': db_info.get('display_name', app_key), 'db_type': db_info.get('db_type')}
+    uri = _resolve_connection_string(db_info, app_key)
+    if _is_placeholder(uri):
+        report.update(status='unresolved', placeholder=uri)
+        return report
+    from time import perf_counter
+    try:
+        engine = _get_engine(uri)
+        t0 = perf_counter()
+        _probe_engine(uri).raw_connection().close()
+        t1 = perf_counter()
+        with engine.connect() as conn:
+            t2 = perf_counter()
+            conn.execute(text(_ping_sql(engine))).scalar()
+            t3 = perf_counter()
+        report.update(status='ok', dialect=engine.dialect.name, connect_ms=round((t1 - t0) * 1000, 2),
+                      checkout_ms=round((t2 - t1) * 1000, 2), select_ms=round((t3 - t2) * 1000, 2))
+    except Exception as e:
+        # Driver errors can embed the DSN; keep the message short and log the detail server-side
+        logging.warning(f'Health probe failed for {app_key}: {e}')
+        report.update(status='error', error=type(e).__name__)
+    return report
+
+
+def _health_report(force=False):
+    """Probe every configured source in parallel, reusing a cached report when it is fresh.
+    While another caller is refreshing, the previous report is returned (marked `stale`) rather
+    than waiting; a probe still running after HEALTH_PROBE_TIMEOUT is reported as `timeout` and
+    left to finish in the background.
+    """
+    from time import time as now
+    cached = _HEALTH_CACHE['report']
+    if not force and cached and now() - _HEALTH_CACHE['at'] < HEALTH_CACHE_SECONDS:
+        return cached
+    if not _HEALTH_LOCK.acquire(blocking=not cached):
+        return dict(cached, stale=True)
+    try:
+        cached = _HEALTH_CACHE['report']
+        if not force and cached and now() - _HEALTH_CACHE['at'] < HEALTH_CACHE_SECONDS:
+            return cached
+        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+        items = list(current_config().db_config.items())
+        pool = ThreadPoolExecutor(max_workers=max(1, min(8, len(items))), thread_name_prefix='health-probe')
+        try:
+            futures = [pool.submit(_probe_source, key, info) for key, info in items]
+            deadline = now() + HEALTH_PROBE_TIMEOUT
+            sources = {}
+            for (key, info), future in zip(items, futures):
+                try:
+                    sources[key] = future.result(timeout=max(0.0, deadline - now()))
+                except FutureTimeout:
+                    logging.warning(f'Health probe for {key} timed out after {HEALTH_PROBE_TIMEOUT}s')
+                    sources[key] = {'display_name': info.get('display_name', key), 'db_type': info.get('db_type'),
+                                    'status': 'timeout'}
+        finally:
+            # Do not wait for hung probes; the driver connect timeout ends them eventually
+            pool.shutdown(wait=False, cancel_futures=True)
+        failed = [k for k, p in sources.items() if p['status'] in ('error', 'timeout')]
+        report = {
+            'status': 'degraded' if failed else 'ok',
+            'checked_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            'pid': os.getpid(),
+            'config_version': current_config().version,
+            'sources': sources,
+        }
+        _HEALTH_CACHE['report'] = report
+        _HEALTH_CACHE['at'] = now()
+        return report
+    finally:
+        _HEALTH_LOCK.release()
+
+
+def _warm_source(app_key, db_info, min_conns):
+    """Hold `min_conns` validated connections at once so the pool keeps that many open."""
+    uri = _resolve_connection_string(db_info, app_key)
+    if _is_placeholder(uri):
+        return
+    engine = _get_engine(uri)
+    size = getattr(engine.pool, 'size', None)
+    if callable(size):
+        min_conns = min(min_conns, size())
+    conns = []
+    try:
+        for _ in range(min_conns):
+            conn = engine.connect()
+            conns.append(conn)
+            conn.execute(text(_ping_sql(engine))).scalar()
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def _pool_warmer_loop():
+    from time import sleep
+    while True:
+        for app_key, db_info in refresh_config().db_config.items():
+            try:
+                _warm_source(app_key, db_info, POOL_WARM_MIN)
+            except Exception as e:
+                logging.warning(f'Pool warm-up failed for {app_key}: {e}')
+        try:
+            _health_report(force=True)
+        except Exception:
+            logging.exception('Health refresh failed')
+        sleep(POOL_WARM_INTERVAL)
+
+
+@app.before_request
+def _start_pool_warmer():
+    # Started from the first request rather than at import so that, under `gunicorn --preload`,
+    # the thread runs in each worker and never in the master.
+    global _WARMER_PID
+    if POOL_WARM_MIN <= 0 or _WARMER_PID == os.getpid():
+        return
+    with _WARMER_LOCK:
+        if _WARMER_PID == os.getpid():
+            return
+        _WARMER_PID = os.getpid()
+    threading.Thread(target=_pool_warmer_loop, name='pool-warmer', daemon=True).start()
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Per-source connectivity report. `?refresh=1` bypasses the cache. Answers 503 when any
+    source is degraded so load balancers and monitors can act on the status code alone.
+    """
+    report = _health_report(force=request.args.get('refresh') in ('1', 'true', 'yes'))
+    return jsonify(report), 200 if report['status'] == 'ok' else 503
+
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=int(os.getenv('PORT', '5000')), debug=True)
@@ -0,0 +1,93 @@
+"""
+Response delivery benchmark: time to first byte, total time and bytes on the wire for a large
+/query result page, per Content-Encoding.
+
+A temporary SQLite source with `--rows` log rows is registered in-process and the portal is
+served by werkzeug on a local port, so the numbers include real socket writes and chunked
+transfer of the streamed page.
+
+Usage:
+  python bench_response.py                 # 5000 rows, identity / gzip / br
+  python bench_response.py --rows 20000 --runs 5
+"""
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+
+def _make_source(path, rows):
+    con = sqlite3.connect(path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT, level TEXT, message TEXT)')
+    now = datetime.utcnow()
+    con.executemany('INSERT INTO logs VALUES (?, ?, ?, ?)', (
+        (i, (now - timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S'), 'ERROR' if i % 7 == 0 else 'INFO',
+         f'request {i} handled by backend-{i % 5}, payload <order id="{i * 31}"/>') for i in range(1, rows + 1)))
+    con.commit()
+    con.close()
+
+
+def _fetch(port, body, encoding):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    if encoding != 'identity':
+        headers['Accept-Encoding'] = encoding
+    t0 = time.perf_counter()
+    conn.request('POST', '/query', body=body, headers=headers)
+    resp = conn.getresponse()
+    first = resp.read(1)
+    ttfb = time.perf_counter() - t0
+    size = len(first) + len(resp.read())
+    total = time.perf_counter() - t0
+    served = resp.getheader('Content-Encoding') or 'identity'
+    conn.close()
+    return {'ttfb_ms': ttfb * 1000, 'total_ms': total * 1000, 'bytes': size, 'encoding': served}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--encodings', default='identity,gzip,br')
+    args = parser.parse_args()
+
+    from werkzeug.serving import make_server
+    import app as portal
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _make_source(db_path, args.rows)
+        portal._CONFIG = portal.current_config().with_sources({'bench_response': {
+            'display_name': 'Bench Response',
+            'connection_string': f'sqlite:///{db_path}',
+            'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY event_time DESC',
+        }})
+        server = make_server('127.0.0.1', 0, portal.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        body = urlencode({'application': 'Bench Response', 'time_span': '1440', 'limit': str(args.rows)})
+        report = {'rows': args.rows, 'streamed': args.rows >= portal.STREAM_MIN_ROWS, 'encodings': {}}
+        try:
+            _fetch(server.port, body, 'identity')  # warm the engine and template cache
+            for encoding in args.encodings.split(','):
+                samples = [_fetch(server.port, body, encoding) for _ in range(args.runs)]
+                report['encodings'][encoding] = {
+                    'served_as': samples[-1]['encoding'],
+                    'bytes': samples[-1]['bytes'],
+                    'ttfb_ms': round(statistics.median(s['ttfb_ms'] for s in samples), 1),
+                    'total_ms': round(statistics.median(s['total_ms'] for s in samples), 1),
+                }
+        finally:
+            server.shutdown()
+            portal._dispose_engines_after_fork()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
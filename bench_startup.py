@@ -0,0 +1,59 @@
+"""
+Startup benchmark: measures how long a fresh process takes to import `app.py` and serve
+its first requests. Each run happens in a new interpreter so import caches don't skew it.
+
+Usage:
+  python bench_startup.py            # 5 runs, local SQLite fallbacks
+  python bench_startup.py --runs 10 --application "FE DB PD"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+_CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app as portal
+t_import = time.perf_counter()
+client = portal.app.test_client()
+client.get('/')
+t_index = time.perf_counter()
+client.post('/query', data={'application': sys.argv[1], 'time_span': '10080', 'limit': '500'})
+t_query = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t_import - t0) * 1000,
+    'first_index_ms': (t_index - t0) * 1000,
+    'first_query_ms': (t_query - t0) * 1000,
+    'pandas_loaded': 'pandas' in sys.modules,
+    'xlsxwriter_loaded': 'xlsxwriter' in sys.modules,
+}))
+'''
+
+
+def run_once(application):
+    out = subprocess.run([sys.executable, '-c', _CHILD, application], cwd=BASE,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--application', default='FE DB PD')
+    args = parser.parse_args()
+
+    samples = [run_once(args.application) for _ in range(args.runs)]
+    for key in ('import_ms', 'first_index_ms', 'first_query_ms'):
+        values = [s[key] for s in samples]
+        print(f"{key:16s} median={statistics.median(values):8.1f}  min={min(values):8.1f}  max={max(values):8.1f}")
+    print(f"pandas loaded at first request:     {any(s['pandas_loaded'] for s in samples)}")
+    print(f"xlsxwriter loaded at first request: {any(s['xlsxwriter_loaded'] for s in samples)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Parquet / Arrow IPC writers for `/export`.
+
+Rows arrive as `ResultSet` batches from a server-side cursor (`app.iter_log_batches`) and are
+written one record batch at a time, so memory stays bounded by the batch size. Low-cardinality
+text columns (LEVEL, channel, backend_system, ...) are dictionary-encoded.
+
+Parquet is zstd-compressed and is the smallest on disk. Arrow IPC is written in the file format,
+uncompressed by default, so readers can memory-map it (`pyarrow.ipc.open_file(pyarrow.memory_map(path))`)
+without a parsing step; pass `ipc_compression='lz4'` or `'zstd'` to trade that for size.
+
+Column types are fixed by the first batch, so numeric columns are typed for what later batches
+may hold. Integer columns stay int64 unless the cursor description says they can hold fractions
+(Oracle returns an unconstrained NUMBER as `int` for whole values and `float` otherwise); those,
+and columns with floats, become float64. Columns with `Decimal` values become
+decimal128(38, >=10). Values that still do not fit their column (a fraction in an int64 column
+of a source with no type information, e.g. SQLite) raise `ColumnTypeDrift` instead of being
+truncated.
+
+Requires the optional `pyarrow` package; `app.py` imports this module lazily.
+"""
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Column names (case-insensitive) that are always dictionary-encoded when they hold text.
+DEFAULT_DICTIONARY_COLUMNS = frozenset({
+    'level', 'channel', 'backend_system', 'backend_system_name', 'app_name', 'server_name',
+    'method_name', 'status', 'response_status', 'response_code', 'sc_status', 'sc_channel',
+    'sc_response_code', 'service_name', 'service_operation',
+})
+# Other text columns are dictionary-encoded when the first batch has at most this share of distinct values.
+DICTIONARY_DISTINCT_RATIO = 0.05
+# Minimum scale for decimal columns, so later batches with more fractional digits still fit
+DECIMAL_MIN_SCALE = 10
+
+
+class ColumnTypeDrift(ValueError):
+    """A later batch holds values that cannot be stored in the column type fixed by the first batch."""
+
+
+def _plain(value):
+    if hasattr(value, 'read'):
+        # Oracle LOB locators
+        return value.read()
+    return value
+
+
+def _to_array(values, type_=None):
+    try:
+        return pa.array(values, type=type_, from_pandas=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # Mixed Python types in one column: fall back to text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+_FLOAT_EXACT_INT = 2 ** 53
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def _numeric_type(values, desc=None):
+    """Arrow type for a column of Python numbers, or None if it holds anything else.
+    Integer columns stay int64 unless the cursor description says the column can hold fractions
+    (a declared scale > 0, or Oracle's -127 for NUMBER/FLOAT without one), in which case a later
+    batch may bring floats and the column is float64 from the start.
+    """
+    present = [v for v in values if v is not None]
+    if not present or not all(_is_number(v) for v in present):
+        return None
+    decimals = [v for v in present if isinstance(v, Decimal)]
+    floats = any(isinstance(v, float) for v in present)
+    if decimals and not floats:
+        scale = max([-d.as_tuple().exponent for d in decimals if d.is_finite()] + [0])
+        return pa.decimal128(38, max(scale, DECIMAL_MIN_SCALE))
+    if floats or decimals:
+        return pa.float64()
+    scale = desc[5] if desc is not None and len(desc) > 5 else None
+    if scale is not None and scale != 0 and not any(abs(v) > _FLOAT_EXACT_INT for v in present):
+        return pa.float64()
+    return pa.int64()
+
+
+def _coerce(values, type_):
+    """Convert numbers to the Python type pyarrow expects for a numeric column, raising ValueError
+    for values that do not belong there. pyarrow truncates a float stored in an integer column
+    even with safe=True, so mismatches are caught here rather than left to the converter.
+    """
+    out = []
+    for v in values:
+        if v is not None:
+            if not _is_number(v):
+                raise ValueError(f'{type(v).__name__} value {v!r}')
+            if pa.types.is_floating(type_) and isinstance(v, Decimal):
+                v = float(v)
+            elif pa.types.is_decimal(type_) and isinstance(v, float):
+                v = Decimal(repr(v))
+            elif pa.types.is_integer(type_) and not isinstance(v, int):
+                if v != int(v):
+                    raise ValueError(f'non-integral value {v!r}')
+                v = int(v)
+        out.append(v)
+    return out
+
+
+class _DictionaryColumn:
+    """Encodes a text column against a dictionary that only ever grows, so every record batch
+    after the first can be written as an IPC dictionary delta.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, values):
+        indices = []
+        for v in values:
+            if v is None:
+                indices.append(None)
+                continue
+            v = str(v)
+            code = self.codes.get(v)
+            if code is None:
+                code = self.codes[v] = len(self.values)
+                self.values.append(v)
+            indices.append(code)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(self.values, type=pa.string()))
+
+
+def _infer_schema(rs, columns, dictionary_columns):
+    fields, dictionaries = [], {}
+    wanted = {c.lower() for c in (dictionary_columns or ())} | DEFAULT_DICTIONARY_COLUMNS
+    description = rs.description or ()
+    for i, name in enumerate(rs.columns):
+        desc = description[i] if i < len(description) else None
+        type_ = _numeric_type(columns[i], desc) or _to_array(columns[i]).type
+        if pa.types.is_null(type_):
+            type_ = pa.string()
+        if pa.types.is_string(type_):
+            distinct = len(set(v for v in columns[i] if v is not None))
+            if str(name).lower() in wanted or (len(rs) >= 100 and distinct <= len(rs) * DICTIONARY_DISTINCT_RATIO):
+                dictionaries[i] = _DictionaryColumn()
+                type_ = pa.dictionary(pa.int32(), pa.string())
+        fields.append(pa.field(str(name), type_))
+    return pa.schema(fields), dictionaries
+
+
+def _record_batch(columns, schema, dictionaries):
+    arrays = []
+    for i, field in enumerate(schema):
+        if i in dictionaries:
+            arrays.append(dictionaries[i].encode(columns[i]))
+            continue
+        if pa.types.is_string(field.type):
+            arrays.append(_to_array(columns[i], field.type))
+            continue
+        numeric = pa.types.is_floating(field.type) or pa.types.is_decimal(field.type) or pa.types.is_integer(field.type)
+        try:
+            values = _coerce(columns[i], field.type) if numeric else columns[i]
+            arrays.append(pa.array(values, type=field.type, from_pandas=False, safe=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError) as e:
+            raise ColumnTypeDrift(f'column {field.name!r} ({field.type}): {e}') from e
+    return pa.record_batch(arrays, schema=schema)
+
+
+def write_columnar(batches, sink, fmt, dictionary_columns=None, ipc_compression=None):
+    """Write `ResultSet` batches to the binary file object `sink` as `parquet` or `arrow`.
+    `dictionary_columns` adds names to DEFAULT_DICTIONARY_COLUMNS. Returns the number of rows
+    written; nothing is written when there are no rows.
+    """
+    writer = schema = dictionaries = None
+    total = 0
+    try:
+        for rs in batches:
+            if not rs:
+                continue
+            columns = [[_plain(r[i]) for r in rs.rows] for i in range(len(rs.columns))]
+            if writer is None:
+                schema, dictionaries = _infer_schema(rs, columns, dictionary_columns)
+                if fmt == 'parquet':
+                    dict_names = [schema.field(i).name for i in dictionaries]
+                    writer = pq.ParquetWriter(sink, schema, compression='zstd', use_dictionary=dict_names or False)
+                else:
+                    writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(
+                        compression=ipc_compression, emit_dictionary_deltas=True))
+            writer.write_batch(_record_batch(columns, schema, dictionaries))
+            total += len(rs)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as portal
+
+
+def add_sources(monkeypatch, **sources):
+    """Install a config snapshot with extra db_config entries for the duration of a test."""
+    monkeypatch.setattr(portal, '_CONFIG', portal.current_config().with_sources(sources))
+
+
+@pytest.fixture
+def logs_source(tmp_path, monkeypatch):
+    """Register a temporary SQLite source "Selection Test" with 120 rows, one per minute
+    over the last two hours. Returns the query context the UI would post back.
+    """
+    db_path = tmp_path / 'selection.db'
+    con = sqlite3.connect(db_path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT, level TEXT, message TEXT)')
+    now = datetime.utcnow()
+    for i in range(1, 121):
+        ts = (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')
+        con.execute('INSERT INTO logs (id, event_time, level, message) VALUES (?, ?, ?, ?)',
+                    (i, ts, 'ERROR' if i % 3 == 0 else 'INFO', f'<b>payload {i}</b>'))
+    con.commit()
+    con.close()
+    add_sources(monkeypatch, selection_test={
+        'display_name': 'Selection Test',
+        'connection_string': f'sqlite:///{db_path}',
+        'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY event_time DESC',
+    })
+    return {
+        'application': 'Selection Test',
+        'window_start': (now - timedelta(hours=3)).strftime('%Y-%m-%d %H:%M:%S'),
+        'window_end': now.strftime('%Y-%m-%d %H:%M:%S'),
+        'limit': 500,
+    }
@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for the logs portal.
+
+Usage:
+  gunicorn -c deploy/gunicorn.conf.py app:app
+
+With `preload_app` the master imports `app.py` once (config files, ${VAR} expansion and
+log handler setup happen a single time) and workers are forked from it. Database engines
+are never created in the master; each worker builds its own on first use.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', 'logs/gunicorn.log')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', 'logs/gunicorn.log')
+loglevel = 'info'
+
+
+def post_fork(server, worker):
+    # os.register_at_fork already does this on POSIX; kept explicit so the intent is visible
+    # and so engines created by anything in the master are never shared with a worker.
+    import app as portal
+    portal._dispose_engines_after_fork()
@@ -35,4 +35,4 @@ if ($content -match '\$-{') {
 
 # Start the Flask app with Gunicorn
 Write-Host "Starting application with Gunicorn..."
-python -m gunicorn --bind 0.0.0.0:5000 --log-file logs/gunicorn.log --log-level info app:app
\ No newline at end of file
+python -m gunicorn -c deploy/gunicorn.conf.py app:app
\ No newline at end of file
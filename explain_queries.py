@@ -0,0 +1,166 @@
+"""
+Query plan inspector for every source in `db_config.json`.
+
+Runs each `select_query` through the backend's EXPLAIN with representative binds (the last
+hour, no optional filters) and flags plans that will hurt on large tables:
+
+  full_scan           the log table is read without an index (SQLite `SCAN`, MySQL `type=ALL`,
+                      Oracle `TABLE ACCESS FULL`)
+  filesort            rows are sorted after the fetch (SQLite temp B-tree, MySQL `Using filesort`,
+                      Oracle `SORT ORDER BY`)
+  missing_time_index  no index on the table leads with the column filtered by `:start_time`
+
+Output is JSON, one object per source, so it can be diffed or checked in CI after a config
+change. Sources whose `${VAR}` placeholder cannot be resolved are reported, not attempted.
+
+Usage:
+  python explain_queries.py                   # all sources, JSON to stdout
+  python explain_queries.py --source fe_pd --fail-on full_scan,missing_time_index
+"""
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+import app as portal
+
+FLAGS = ('full_scan', 'filesort', 'missing_time_index')
+
+_TABLE_RE = re.compile(r'\bFROM\s+([\w$#.]+)', re.IGNORECASE)
+_TIME_COLUMN_RE = portal._TIME_COLUMN_RE
+
+
+def _explain_sqlite(conn, sql, params, table):
+    plan = [{'id': r[0], 'parent': r[1], 'detail': r[3]}
+            for r in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params)]
+    flags = set()
+    for step in plan:
+        detail = step['detail'].upper()
+        if detail.startswith('SCAN ') and 'USING' not in detail and table.upper() in detail:
+            flags.add('full_scan')
+        if 'USE TEMP B-TREE FOR ORDER BY' in detail:
+            flags.add('filesort')
+    return plan, flags
+
+
+def _explain_mysql(conn, sql, params, table):
+    result = conn.execute(text(f'EXPLAIN {sql}'), params)
+    keys = list(result.keys())
+    plan = [dict(zip(keys, r)) for r in result]
+    flags = set()
+    for step in plan:
+        if str(step.get('type') or '').upper() == 'ALL':
+            flags.add('full_scan')
+        if 'filesort' in str(step.get('Extra') or '').lower():
+            flags.add('filesort')
+    return plan, flags
+
+
+def _explain_oracle(conn, sql, params, table):
+    # EXPLAIN PLAN does not take bind values; the raw statement with its :name placeholders
+    # is sent as-is through the driver.
+    statement_id = f'portal_{datetime.utcnow():%H%M%S%f}'
+    conn.exec_driver_sql(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+    rows = conn.execute(text(
+        'SELECT id, parent_id, operation, options, object_name, access_predicates, filter_predicates '
+        'FROM plan_table WHERE statement_id = :sid ORDER BY id'), {'sid': statement_id})
+    keys = ['id', 'parent_id', 'operation', 'options', 'object_name', 'access_predicates', 'filter_predicates']
+    plan = [dict(zip(keys, r)) for r in rows]
+    xplan = [r[0] for r in conn.execute(text(
+        "SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY('PLAN_TABLE', :sid, 'TYPICAL'))"), {'sid': statement_id})]
+    conn.execute(text('DELETE FROM plan_table WHERE statement_id = :sid'), {'sid': statement_id})
+    flags = set()
+    for step in plan:
+        op, opts = (step['operation'] or '').upper(), (step['options'] or '').upper()
+        if op == 'TABLE ACCESS' and opts == 'FULL':
+            flags.add('full_scan')
+        if op == 'SORT' and 'ORDER BY' in opts:
+            flags.add('filesort')
+    return {'steps': plan, 'dbms_xplan': xplan}, flags
+
+
+_EXPLAINERS = {
+    'sqlite': _explain_sqlite,
+    'mysql': _explain_mysql,
+    'mariadb': _explain_mysql,
+    'oracle': _explain_oracle,
+}
+
+
+def _has_time_index(engine, table, time_column):
+    """True when an index (or the primary key) on `table` leads with `time_column`."""
+    schema, _, name = table.rpartition('.')
+    insp = inspect(engine)
+    column = time_column.rpartition('.')[2].lower()
+    leading = [idx['column_names'][0] for idx in insp.get_indexes(name, schema=schema or None) if idx.get('column_names')]
+    pk = insp.get_pk_constraint(name, schema=schema or None).get('constrained_columns') or []
+    if pk:
+        leading.append(pk[0])
+    return any(c and c.lower() == column for c in leading)
+
+
+def explain_source(app_key, db_info, now=None):
+    """EXPLAIN one configured source. Never raises; errors are reported in the result."""
+    report = {'source': app_key, 'display_name': db_info.get('display_name', app_key), 'db_type': db_info.get('db_type')}
+    sql = db_info.get('select_query') or ''
+    table_m, time_m = _TABLE_RE.search(sql), _TIME_COLUMN_RE.search(sql)
+    report['table'] = table_m.group(1) if table_m else None
+    report['time_column'] = time_m.group(1) if time_m else None
+    uri = portal._resolve_connection_string(db_info, app_key)
+    if portal._is_placeholder(uri):
+        report.update(status='unresolved', placeholder=uri)
+        return report
+    now = now or datetime.utcnow()
+    params = portal._query_params(app_key, db_info, None, now - timedelta(hours=1), now, 500)
+    try:
+        engine = portal._get_engine(uri)
+        explainer = _EXPLAINERS.get(engine.dialect.name)
+        report['dialect'] = engine.dialect.name
+        if explainer is None:
+            report.update(status='unsupported')
+            return report
+        with engine.connect() as conn:
+            plan, flags = explainer(conn, sql, params, report['table'] or '')
+        if report['table'] and report['time_column'] and not _has_time_index(engine, report['table'], report['time_column']):
+            flags.add('missing_time_index')
+        report.update(status='ok', flags=sorted(flags), plan=plan)
+    except Exception as e:
+        report.update(status='error', error=f'{type(e).__name__}: {e}'.splitlines()[0][:300])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', action='append', help='db_config.json key to inspect (repeatable; default all)')
+    parser.add_argument('--fail-on', default='', help=f'comma-separated flags that make the exit code 1 ({", ".join(FLAGS)})')
+    parser.add_argument('-o', '--output', default='-', help='write JSON here instead of stdout')
+    args = parser.parse_args(argv)
+
+    fail_on = {f.strip() for f in args.fail_on.split(',') if f.strip()}
+    unknown = fail_on - set(FLAGS)
+    if unknown:
+        parser.error(f'unknown flags: {", ".join(sorted(unknown))}')
+    db_config = portal.current_config().db_config
+    keys = args.source or list(db_config)
+    reports = []
+    for key in keys:
+        if key not in db_config:
+            reports.append({'source': key, 'status': 'unknown_source'})
+            continue
+        reports.append(explain_source(key, db_config[key]))
+
+    payload = json.dumps(reports, indent=2, default=str)
+    if args.output == '-':
+        print(payload)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    failed = [r for r in reports if fail_on & set(r.get('flags', ())) or r['status'] in ('error', 'unknown_source')]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
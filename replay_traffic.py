@@ -0,0 +1,281 @@
+"""
+Record production traffic from `logs/app.log` and replay it against the portal.
+
+`_before_request_log` / `_after_request_log` in app.py write one "REQ start" and one
+"REQ done" line per request. `extract` pairs them into a JSONL trace (arrival offset, method,
+path, query params, form, original status and duration) with sensitive values redacted and
+client addresses dropped. `replay` sends the trace at a configurable concurrency and speed-up,
+either in-process through Flask's test client (pointing every source at its local SQLite
+stand-in under db/) or over HTTP to a running server, and reports latency percentiles,
+throughput and errors per endpoint.
+
+Usage:
+  python replay_traffic.py extract logs/app.log -o trace.jsonl
+  python replay_traffic.py replay trace.jsonl --concurrency 8 --speedup 10
+  python replay_traffic.py replay trace.jsonl --base-url http://127.0.0.1:5000 --speedup 0 --json
+"""
+import argparse
+import ast
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+_START_RE = re.compile(
+    r'^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \S+ \S+ REQ start (?P<addr>\S+) (?P<method>[A-Z]+) (?P<path>\S+) '
+    r'params=(?P<params>\{.*?\}) form=(?P<form>\{.*\})\s*$')
+_DONE_RE = re.compile(
+    r'^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \S+ \S+ REQ done (?P<addr>\S+) (?P<method>[A-Z]+) (?P<path>\S+) '
+    r'status=(?P<status>\d+) duration_ms=(?P<duration>\d+)')
+
+# Field names whose values are never written to a trace. jsession_id / transaction ids are
+# replaced with '' so the replayed query runs unfiltered rather than against a real session.
+SENSITIVE_KEYS = frozenset({
+    'email', 'token', 'password', 'jsession_id', 'jsid', 'sc_transaction_id', 'transaction_id',
+    'ids', 'rows',
+})
+# Endpoints with side effects (mail, config reload) are left out of traces by default.
+DEFAULT_EXCLUDE = ('/send_selected_logs', '/__reload_config')
+
+
+def _redact(values):
+    return {k: ('' if k.lower() in SENSITIVE_KEYS else v) for k, v in values.items()}
+
+
+def _parse_dict(text):
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def extract_trace(lines, include_static=False, exclude=DEFAULT_EXCLUDE):
+    """Pair REQ start/done log lines into trace records, ordered by arrival."""
+    pending = defaultdict(deque)
+    records = []
+    first_ts = None
+    for line in lines:
+        m = _START_RE.match(line)
+        if m:
+            path = m['path']
+            if (path.startswith('/static/') and not include_static) or path in exclude:
+                continue
+            ts = datetime.strptime(m['ts'], '%Y-%m-%d %H:%M:%S,%f')
+            first_ts = first_ts or ts
+            record = {
+                'offset_s': round((ts - first_ts).total_seconds(), 3),
+                'method': m['method'],
+                'path': path,
+                'params': _redact(_parse_dict(m['params'])),
+                'form': _redact(_parse_dict(m['form'])),
+            }
+            pending[(m['addr'], m['method'], path)].append(record)
+            records.append(record)
+            continue
+        m = _DONE_RE.match(line)
+        if m:
+            queue = pending.get((m['addr'], m['method'], m['path']))
+            if queue:
+                record = queue.popleft()
+                record['status'] = int(m['status'])
+                record['duration_ms'] = int(m['duration'])
+    return records
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _use_sqlite_standins(portal, sqlite_dir):
+    """Point every configured source at <sqlite_dir>/<key>.db so a replay never reaches a real
+    database. Sources without a stand-in are removed (their queries return no rows).
+    """
+    cfg = portal.current_config()
+    sources = {}
+    for key, info in cfg.db_config.items():
+        path = os.path.join(sqlite_dir, f'{key}.db')
+        if os.path.exists(path):
+            sources[key] = dict(info, connection_string=f'sqlite:///{os.path.abspath(path)}')
+        else:
+            print(f'No SQLite stand-in for {key}; its requests will return no rows', file=sys.stderr)
+    standins = portal._make_snapshot(sources, {}, cfg.version, cfg.stamp, expand=False)
+    portal._CONFIG = standins
+    # Pin the stand-ins for the whole replay: a reload or config edit must never swap the real
+    # snapshot (and its production DB_URI_* connections) back in between requests
+    portal.refresh_config = lambda force=False: standins
+    return standins
+
+
+def _in_process_sender(sqlite_dir):
+    import app as portal
+    _use_sqlite_standins(portal, sqlite_dir)
+    local = threading.local()
+
+    def send(record):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = portal.app.test_client()
+        resp = client.open(record['path'], method=record['method'], query_string=record.get('params') or None,
+                           data=record.get('form') or None)
+        resp.get_data()
+        return resp.status_code
+    return send
+
+
+def _http_sender(base_url):
+    from urllib.error import HTTPError
+    from urllib.parse import urlencode
+    from urllib.request import Request, urlopen
+
+    def send(record):
+        url = base_url.rstrip('/') + record['path']
+        if record.get('params'):
+            url += '?' + urlencode(record['params'])
+        body = urlencode(record['form']).encode() if record.get('form') else None
+        try:
+            with urlopen(Request(url, data=body, method=record['method']), timeout=120) as resp:
+                resp.read()
+                return resp.status
+        except HTTPError as e:
+            return e.code
+    return send
+
+
+def replay(records, send, concurrency=4, speedup=1.0, app_map=None):
+    """Replay trace records and return per-endpoint stats.
+    Requests are issued at `offset_s / speedup` after the start (open loop); `speedup` <= 0
+    sends them back to back, bounded only by `concurrency`.
+    With a schedule, latency is measured from each request's scheduled send time, so time spent
+    waiting for a free worker (when arrivals outrun `concurrency`) counts against it instead of
+    being omitted; that wait is also reported on its own as `queue_*_ms`. Back to back there is
+    no schedule and latency is the service time.
+    """
+    samples = defaultdict(list)
+    queued = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    app_map = app_map or {}
+
+    def run(record, scheduled):
+        if app_map and record.get('form', {}).get('application') in app_map:
+            record = dict(record, form=dict(record['form'], application=app_map[record['form']['application']]))
+        t0 = time.perf_counter()
+        try:
+            status = send(record)
+        except Exception:
+            status = None
+        done = time.perf_counter()
+        key = f"{record['method']} {record['path']}"
+        with lock:
+            if scheduled is None:
+                samples[key].append((done - t0) * 1000)
+                queued[key].append(0.0)
+            else:
+                samples[key].append((done - scheduled) * 1000)
+                queued[key].append(max(0.0, t0 - scheduled) * 1000)
+            if status is None or status >= 500:
+                errors[key] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            scheduled = None
+            if speedup > 0:
+                scheduled = started + record['offset_s'] / speedup
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, record, scheduled)
+    wall = time.perf_counter() - started
+
+    report = {'wall_s': round(wall, 3), 'requests': sum(len(v) for v in samples.values()),
+              'errors': sum(errors.values()), 'endpoints': {}}
+    report['throughput_rps'] = round(report['requests'] / wall, 2) if wall else None
+    for key, values in sorted(samples.items()):
+        values.sort()
+        waits = sorted(queued[key])
+        report['endpoints'][key] = {
+            'count': len(values),
+            'errors': errors[key],
+            'throughput_rps': round(len(values) / wall, 2) if wall else None,
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'p99_ms': round(percentile(values, 99), 2),
+            'queue_p95_ms': round(percentile(waits, 95), 2),
+            'queue_max_ms': round(waits[-1], 2),
+        }
+    return report
+
+
+def _print_report(report):
+    print(f"{'endpoint':32s} {'count':>6s} {'errors':>6s} {'rps':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'queue p95':>10s}")
+    for key, s in report['endpoints'].items():
+        print(f"{key:32s} {s['count']:6d} {s['errors']:6d} {s['throughput_rps']:8.2f} "
+              f"{s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['p99_ms']:9.1f} {s['queue_p95_ms']:10.1f}")
+    print(f"total: {report['requests']} requests, {report['errors']} errors, "
+          f"{report['throughput_rps']} req/s over {report['wall_s']} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ex = sub.add_parser('extract', help='build a redacted JSONL trace from app.log')
+    ex.add_argument('logfile', nargs='+')
+    ex.add_argument('-o', '--output', default='-')
+    ex.add_argument('--include-static', action='store_true')
+
+    rp = sub.add_parser('replay', help='replay a JSONL trace and report latency per endpoint')
+    rp.add_argument('trace')
+    rp.add_argument('--concurrency', type=int, default=4)
+    rp.add_argument('--speedup', type=float, default=1.0, help='time compression factor; 0 = as fast as possible')
+    rp.add_argument('--base-url', help='replay over HTTP instead of in-process')
+    rp.add_argument('--sqlite-dir', default=os.path.join(BASE, 'db'), help='local SQLite stand-ins for in-process replay')
+    rp.add_argument('--app-map', action='append', default=[], metavar='OLD=NEW',
+                    help='rename an application display name found in old traces')
+    rp.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'extract':
+        lines = []
+        for path in args.logfile:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                lines.extend(f)
+        records = extract_trace(lines, include_static=args.include_static)
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+        try:
+            for record in records:
+                out.write(json.dumps(record) + '\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f'{len(records)} requests extracted', file=sys.stderr)
+        return 0
+
+    with open(args.trace, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    send = _http_sender(args.base_url) if args.base_url else _in_process_sender(args.sqlite_dir)
+    app_map = dict(item.split('=', 1) for item in args.app_map)
+    report = replay(records, send, concurrency=args.concurrency, speedup=args.speedup, app_map=app_map)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
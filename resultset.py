@@ -0,0 +1,158 @@
+"""
+Compact, columnar-friendly container for query results.
+
+`query_logs()` returns a `ResultSet`: one tuple of column names plus a list of plain row
+tuples. The template, the Excel export and the email formatter all read it directly, so
+there is no per-row dict (repeating every column name) and no DataFrame round trip.
+"""
+import csv
+import gzip
+import html
+import io
+
+
+class ResultSet:
+    """Column names (tuple) plus row tuples in query order. `description` is the DB-API
+    `cursor.description` (name, type_code, display_size, internal_size, precision, scale, null_ok)
+    when the rows came from a cursor, else None.
+    """
+
+    __slots__ = ('columns', 'rows', 'description', '_index')
+
+    def __init__(self, columns, rows, description=None):
+        self.columns = tuple(columns)
+        self.rows = rows
+        self.description = description
+        self._index = {c: i for i, c in enumerate(self.columns)}
+
+    @classmethod
+    def from_cursor(cls, result, max_rows=None):
+        """Build from a SQLAlchemy `Result`, storing rows as plain tuples.
+        `max_rows` stops fetching once that many rows have been read.
+        """
+        columns = tuple(result.keys())
+        description = cursor_description(result)
+        if max_rows is None:
+            rows = [tuple(r) for r in result.fetchall()]
+        else:
+            rows = [tuple(r) for r in result.fetchmany(max_rows)]
+        return cls(columns, rows, description)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from a list of dicts (e.g. a legacy JSON payload). Column order follows first appearance."""
+        columns = []
+        for rec in records:
+            for key in rec:
+                if key not in columns:
+                    columns.append(key)
+        return cls(columns, [tuple(rec.get(c) for c in columns) for rec in records])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def index(self, column):
+        """Position of `column` in each row tuple, or None if absent."""
+        return self._index.get(column)
+
+    def column(self, name):
+        """Values of one column, in row order."""
+        i = self._index[name]
+        return [r[i] for r in self.rows]
+
+    def filter(self, predicate):
+        """New ResultSet (sharing the row tuples) with rows for which predicate(row) is true."""
+        return ResultSet(self.columns, [r for r in self.rows if predicate(r)], self.description)
+
+    def previews(self, max_chars):
+        """Yield rows with long text / CLOB values truncated to `max_chars` for display.
+        With `max_chars` falsy the stored tuples are yielded unchanged.
+        """
+        if not max_chars:
+            yield from self.rows
+            return
+        for row in self.rows:
+            yield tuple(_preview(v, max_chars) for v in row)
+
+
+def cursor_description(result):
+    """DB-API description of a SQLAlchemy `Result`, or None when the driver gives none."""
+    cursor = getattr(result, 'cursor', None)
+    return tuple(cursor.description) if cursor is not None and cursor.description else None
+
+
+def _preview(value, max_chars):
+    if hasattr(value, 'read'):
+        # Oracle LOB locators: read just enough for the preview
+        value = value.read(1, max_chars + 1)
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + '…'
+    return value
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'read'):
+        value = value.read()
+    return str(value)
+
+
+def write_xlsx(rs, sink, sheet_name='Logs'):
+    """Write the result as an XLSX workbook to `sink` (a path or binary file object).
+    Rows go through xlsxwriter's constant_memory mode: each row is flushed to a temp file as it
+    is written instead of building the sheet in memory (xlsxwriter turns that mode off when
+    `in_memory` is set, so it is not).
+    """
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(sink, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    sheet = workbook.add_worksheet(sheet_name)
+    bold = workbook.add_format({'bold': True})
+    sheet.write_row(0, 0, rs.columns, bold)
+    for r, row in enumerate(rs.rows, start=1):
+        for c, value in enumerate(row):
+            if hasattr(value, 'read'):
+                value = value.read()
+            sheet.write(r, c, value)
+    workbook.close()
+
+
+def to_xlsx_bytes(rs, sheet_name='Logs'):
+    """XLSX workbook as bytes (for email attachments, which are capped in size)."""
+    output = io.BytesIO()
+    write_xlsx(rs, output, sheet_name)
+    return output.getvalue()
+
+
+def to_csv_gzip(rs):
+    """UTF-8 CSV (header + rows), gzip-compressed."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(rs.columns)
+    for row in rs.rows:
+        writer.writerow([_text(v) for v in row])
+    return gzip.compress(buf.getvalue().encode('utf-8'))
+
+
+def to_html_table(rs, css_class='web3-table'):
+    """HTML table with every header and cell escaped."""
+    parts = [f'<table class="{css_class}"><thead><tr>']
+    parts.extend(f'<th>{html.escape(str(c))}</th>' for c in rs.columns)
+    parts.append('</tr></thead><tbody>')
+    for row in rs.rows:
+        parts.append('<tr>')
+        parts.extend(f'<td>{html.escape(_text(v))}</td>' for v in row)
+        parts.append('</tr>')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
@@ -0,0 +1,30 @@
+"""
+Tests for lazy imports and per-process engine caching in app.py.
+"""
+import os
+import subprocess
+import sys
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_import_does_not_load_pandas():
+    code = "import sys, app; print('pandas' in sys.modules, 'xlsxwriter' in sys.modules, 'smtplib' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=BASE, capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == 'False False False'
+
+
+def test_engine_cached_per_uri_and_reset_after_fork(monkeypatch):
+    import app
+    # Private engine cache: the fork reset must not drop the engines other tests are using
+    monkeypatch.setattr(app, '_ENGINES', {})
+    monkeypatch.setattr(app, '_ENGINES_LOCK', app._ENGINES_LOCK)
+    monkeypatch.setattr(app, '_ENGINES_PID', app._ENGINES_PID)
+    uri = f"sqlite:///{os.path.join(BASE, 'db', 'fe_pd.db')}"
+    engine = app._get_engine(uri)
+    assert app._get_engine(uri) is engine
+    app._dispose_engines_after_fork()
+    fresh = app._get_engine(uri)
+    assert fresh is not engine
+    engine.dispose()
+    fresh.dispose()
@@ -0,0 +1,108 @@
+"""
+Tests for the Parquet / Arrow IPC exports.
+"""
+import io
+from decimal import Decimal
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet as pq
+
+import app as portal
+from columnar_export import ColumnTypeDrift, write_columnar
+from resultset import ResultSet
+
+
+def _batches():
+    yield ResultSet(('id', 'LEVEL', 'message'), [(i, 'ERROR' if i % 2 else 'INFO', f'msg {i}') for i in range(150)])
+    yield ResultSet(('id', 'LEVEL', 'message'), [(i, 'WARN', None) for i in range(150, 200)])
+
+
+def test_arrow_file_is_memory_mappable_with_dictionary_deltas(tmp_path):
+    path = tmp_path / 'out.arrow'
+    with open(path, 'wb') as f:
+        assert write_columnar(_batches(), f, 'arrow') == 200
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    assert table.num_rows == 200
+    assert pa.types.is_dictionary(table.schema.field('LEVEL').type)
+    assert not pa.types.is_dictionary(table.schema.field('message').type)
+    assert table.column('LEVEL').to_pylist()[-1] == 'WARN'
+
+
+def test_parquet_round_trip():
+    sink = io.BytesIO()
+    assert write_columnar(_batches(), sink, 'parquet') == 200
+    table = pq.read_table(io.BytesIO(sink.getvalue()))
+    assert pa.types.is_integer(table.schema.field('id').type)
+    assert table.column('id').to_pylist() == list(range(200))
+    assert pa.types.is_dictionary(table.schema.field('LEVEL').type)
+
+
+def test_export_route_streams_batches(logs_source, monkeypatch):
+    monkeypatch.setattr(portal, 'EXPORT_BATCH_ROWS', 50)
+    resp = portal.app.test_client().post('/export', data={'application': 'Selection Test', 'time_span': '180', 'limit': '100', 'format': 'parquet'})
+    assert resp.status_code == 200
+    table = pq.read_table(io.BytesIO(resp.data))
+    assert table.num_rows == 100
+    assert pa.types.is_dictionary(table.schema.field('level').type)
+    assert table.schema.field('id').type == pa.int64()
+
+
+def _drifting(column, *batches):
+    for values in batches:
+        yield ResultSet((column,), [(v,) for v in values])
+
+
+# DB-API descriptions as cx_Oracle reports them: `amt` is an unconstrained NUMBER (scale -127),
+# `rate` NUMBER(10, 4), `n` NUMBER(10)
+ORACLE_DESCRIPTION = (('amt', None, None, None, 0, -127, True), ('rate', None, None, None, 10, 4, True),
+                      ('n', None, None, None, 10, 0, True))
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow'])
+def test_numeric_types_drifting_across_batches(fmt):
+    sink = io.BytesIO()
+    cols = ('amt', 'rate', 'n')
+    batches = [ResultSet(cols, [(1, Decimal('1.5'), 7)], ORACLE_DESCRIPTION),
+               ResultSet(cols, [(2.5, Decimal('1.25'), None)], ORACLE_DESCRIPTION),
+               ResultSet(cols, [(Decimal('3.75'), 0.125, 9)], ORACLE_DESCRIPTION)]
+    assert write_columnar(iter(batches), sink, fmt) == 3
+    data = sink.getvalue()
+    table = pq.read_table(io.BytesIO(data)) if fmt == 'parquet' else pa.ipc.open_file(pa.BufferReader(data)).read_all()
+    assert table.column('amt').to_pylist() == [1.0, 2.5, 3.75]
+    assert table.column('rate').to_pylist() == [Decimal('1.5'), Decimal('1.25'), Decimal('0.125')]
+    assert table.column('n').to_pylist() == [7, None, 9]
+    assert pa.types.is_integer(table.schema.field('n').type)
+    assert pa.types.is_floating(table.schema.field('amt').type)
+
+
+def test_integer_columns_stay_int64_and_reject_later_fractions():
+    sink = io.BytesIO()
+    assert write_columnar(_drifting('count', [1, 2], [3.0]), sink, 'parquet') == 3
+    table = pq.read_table(io.BytesIO(sink.getvalue()))
+    assert table.schema.field('count').type == pa.int64()
+    # No type information (SQLite): a real fraction later is reported, never truncated
+    with pytest.raises(ColumnTypeDrift, match="'count'"):
+        write_columnar(_drifting('count', [1, 2], [2.5]), io.BytesIO(), 'parquet')
+
+
+def test_large_integer_ids_reject_fractions():
+    big = 2 ** 60
+    with pytest.raises(ColumnTypeDrift, match="'id'"):
+        write_columnar(_drifting('id', [big, big + 1], [Decimal('2.5')]), io.BytesIO(), 'parquet')
+    sink = io.BytesIO()
+    assert write_columnar(_drifting('id', [big, big + 1], [float(2 ** 10)]), sink, 'parquet') == 3
+    assert pq.read_table(io.BytesIO(sink.getvalue())).column('id').to_pylist() == [big, big + 1, 1024]
+
+
+def test_text_in_numeric_column_is_reported():
+    with pytest.raises(ColumnTypeDrift, match="'amt'"):
+        write_columnar(_drifting('amt', [1, 2], ['n/a']), io.BytesIO(), 'arrow')
+
+
+def test_export_route_reports_type_drift(monkeypatch):
+    monkeypatch.setattr(portal, 'iter_log_batches', lambda *a, **k: _drifting('amt', [1], ['n/a']))
+    resp = portal.app.test_client().post('/export', data={'application': 'Selection Test', 'time_span': '180', 'limit': '100', 'format': 'arrow'})
+    assert resp.status_code == 422
+    assert 'amt' in resp.get_data(as_text=True)
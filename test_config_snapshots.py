@@ -0,0 +1,99 @@
+"""
+Tests for immutable config snapshots, reload propagation and engine pruning.
+"""
+import json
+
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def config_files(tmp_path, monkeypatch):
+    """Point the app at a temp deploy_config.json / version counter and restore the snapshot afterwards."""
+    deploy_path = tmp_path / 'deploy_config.json'
+    monkeypatch.setattr(portal, 'DEPLOY_CONFIG_PATH', str(deploy_path))
+    monkeypatch.setattr(portal, 'CONFIG_VERSION_PATH', str(tmp_path / '.config_version'))
+    monkeypatch.setattr(portal, 'CONFIG_CHECK_INTERVAL', 0)
+    monkeypatch.setattr(portal, '_CONFIG', portal._CONFIG)
+    monkeypatch.delenv('RELOAD_TOKEN', raising=False)
+
+    def write(**deploy):
+        deploy_path.write_text(json.dumps({'reload_token': 't0ken', **deploy}))
+    write()
+    portal.refresh_config(force=True)
+    return write
+
+
+def test_snapshot_is_immutable():
+    cfg = portal.current_config()
+    with pytest.raises(TypeError):
+        cfg.db_config['fe_pd'] = {}
+    with pytest.raises(TypeError):
+        cfg.db_config['fe_pd']['connection_string'] = 'sqlite://'
+    with pytest.raises(AttributeError):
+        cfg.version = 99
+
+
+def test_reload_endpoint_bumps_shared_version(config_files, tmp_path):
+    before = portal.current_config()
+    override = f"sqlite:///{tmp_path / 'override.db'}"
+    config_files(db_overrides={'fe_pd': override}, site={'title': 'Reloaded'})
+    resp = portal.app.test_client().post('/__reload_config', headers={'X-Reload-Token': 't0ken'})
+    body = resp.get_json()
+    assert resp.status_code == 200 and body['version'] != before.version
+    assert portal.current_config().stamp[2] == before.stamp[2] + 1
+    assert body['site']['title'] == 'Reloaded'
+    assert portal.current_config().db_config['fe_pd']['connection_string'] == override
+
+
+def test_other_worker_picks_up_new_version(config_files):
+    stale = portal.current_config()
+    portal.bump_config_version()
+    # Another worker still holding the old snapshot sees the counter change on its next check
+    assert portal.refresh_config() is not stale
+    assert portal.current_config().stamp[2] == stale.stamp[2] + 1
+    assert portal.current_config().version != stale.version
+
+
+def test_invalid_json_keeps_previous_snapshot(config_files):
+    good = portal.current_config()
+    with open(portal.DEPLOY_CONFIG_PATH, 'w') as f:
+        f.write('{not json')
+    portal.bump_config_version()
+    assert portal.refresh_config() is good
+
+
+def test_only_changed_engines_are_disposed(config_files, tmp_path):
+    cfg = portal.current_config()
+    keep_uri = portal._resolve_connection_string(cfg.db_config['fe_uat'], 'fe_uat')
+    old_uri = portal._resolve_connection_string(cfg.db_config['fe_pd'], 'fe_pd')
+    kept, replaced = portal._get_engine(keep_uri), portal._get_engine(old_uri)
+    config_files(db_overrides={'fe_pd': f"sqlite:///{tmp_path / 'new.db'}"})
+    portal.bump_config_version()
+    portal.refresh_config()
+    assert portal._get_engine(keep_uri) is kept
+    assert portal._get_engine(old_uri) is not replaced
+
+
+def test_edit_without_reload_gets_new_version(config_files):
+    before = portal.current_config()
+    config_files(site={'title': 'Edited in place'})
+    after = portal.refresh_config(force=True)
+    assert after.stamp[2] == before.stamp[2]
+    assert after.version != before.version
+    # Same files loaded again (as another worker would) give the same version
+    assert portal.load_config_snapshot().version == after.version
+
+
+def test_concurrent_bumps_are_not_lost(config_files):
+    import threading
+    start = portal._read_config_version()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(portal.bump_config_version())) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == list(range(start + 1, start + 21))
+    assert portal._read_config_version() == start + 20
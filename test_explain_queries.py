@@ -0,0 +1,46 @@
+"""
+Tests for explain_queries.py against SQLite sources with and without a time-column index.
+"""
+import json
+import sqlite3
+
+import app as portal
+import explain_queries
+from conftest import add_sources
+
+QUERY = 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY event_time DESC'
+
+
+def _source(path, indexed):
+    con = sqlite3.connect(path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT, level TEXT, message TEXT)')
+    if indexed:
+        con.execute('CREATE INDEX ix_logs_event_time ON logs (event_time)')
+    con.commit()
+    con.close()
+    return {'display_name': path.stem, 'db_type': 'sqlite', 'connection_string': f'sqlite:///{path}', 'select_query': QUERY}
+
+
+def test_flags_full_scan_without_time_index(tmp_path):
+    report = explain_queries.explain_source('plain', _source(tmp_path / 'plain.db', indexed=False))
+    assert report['status'] == 'ok'
+    assert report['table'] == 'logs' and report['time_column'] == 'event_time'
+    assert {'full_scan', 'missing_time_index'} <= set(report['flags'])
+
+
+def test_indexed_time_column_is_clean(tmp_path):
+    report = explain_queries.explain_source('indexed', _source(tmp_path / 'indexed.db', indexed=True))
+    assert report['status'] == 'ok'
+    assert report['flags'] == []
+
+
+def test_unresolved_placeholder_not_attempted():
+    report = explain_queries.explain_source('missing', {'connection_string': '${DB_URI_DOES_NOT_EXIST}', 'select_query': QUERY})
+    assert report['status'] == 'unresolved'
+
+
+def test_cli_fail_on(tmp_path, monkeypatch, capsys):
+    add_sources(monkeypatch, plain=_source(tmp_path / 'plain.db', indexed=False))
+    assert explain_queries.main(['--source', 'plain', '--fail-on', 'missing_time_index']) == 1
+    assert json.loads(capsys.readouterr().out)[0]['source'] == 'plain'
+    assert explain_queries.main(['--source', 'plain']) == 0
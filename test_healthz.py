@@ -0,0 +1,124 @@
+"""
+Tests for /healthz and the pool warmer.
+"""
+import pytest
+
+import app as portal
+from conftest import add_sources
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setitem(portal._HEALTH_CACHE, 'report', None)
+    monkeypatch.setitem(portal._HEALTH_CACHE, 'at', 0.0)
+
+
+def test_healthz_reports_each_source(logs_source, monkeypatch):
+    add_sources(monkeypatch, no_such_source={
+        'display_name': 'Missing Source',
+        'connection_string': '${DB_URI_DOES_NOT_EXIST}',
+    })
+    client = portal.app.test_client()
+    report = client.get('/healthz').get_json()
+    ok = report['sources']['selection_test']
+    assert ok['status'] == 'ok' and ok['dialect'] == 'sqlite'
+    assert ok['connect_ms'] >= 0 and ok['checkout_ms'] >= 0 and ok['select_ms'] >= 0
+    unresolved = report['sources']['no_such_source']
+    assert unresolved == {'display_name': 'Missing Source', 'db_type': None,
+                          'status': 'unresolved', 'placeholder': '${DB_URI_DOES_NOT_EXIST}'}
+    # Cached: a second poll does not re-probe
+    assert client.get('/healthz').get_json()['checked_at'] == report['checked_at']
+
+
+def test_probe_error_does_not_leak_uri(monkeypatch):
+    add_sources(monkeypatch, broken={
+        'display_name': 'Broken',
+        'connection_string': 'sqlite:////nonexistent/dir/secret.db',
+    })
+    report = portal._health_report(force=True)
+    assert report['status'] == 'degraded'
+    assert report['sources']['broken']['status'] == 'error'
+    assert 'secret' not in str(report['sources']['broken'])
+
+
+def test_warm_source_fills_pool(logs_source):
+    info = portal.current_config().db_config['selection_test']
+    portal._warm_source('selection_test', info, 3)
+    engine = portal._get_engine(info['connection_string'])
+    assert engine.pool.checkedin() == 3
+
+
+def test_hung_probe_times_out(logs_source, monkeypatch):
+    import threading
+    release = threading.Event()
+    real_probe = portal._probe_source
+
+    def probe(app_key, db_info):
+        if app_key == 'hung':
+            release.wait(5)
+        return real_probe(app_key, db_info)
+    add_sources(monkeypatch, hung={'display_name': 'Hung', 'connection_string': 'sqlite://'})
+    monkeypatch.setattr(portal, '_probe_source', probe)
+    monkeypatch.setattr(portal, 'HEALTH_PROBE_TIMEOUT', 0.2)
+    try:
+        report = portal._health_report(force=True)
+    finally:
+        release.set()
+    assert report['status'] == 'degraded'
+    assert report['sources']['hung']['status'] == 'timeout'
+    assert report['sources']['selection_test']['status'] == 'ok'
+
+
+def test_stale_report_served_while_refreshing(monkeypatch):
+    monkeypatch.setitem(portal._HEALTH_CACHE, 'report', {'status': 'ok', 'sources': {}})
+    with portal._HEALTH_LOCK:
+        report = portal.app.test_client().get('/healthz').get_json()
+    assert report == {'status': 'ok', 'sources': {}, 'stale': True}
+
+
+def test_connect_timeout_passed_to_driver(monkeypatch):
+    monkeypatch.setattr(portal, 'DB_CONNECT_TIMEOUT', 7)
+    assert portal._connect_args('oracle+oracledb://u:p@host:1521/?service_name=X') == {'tcp_connect_timeout': 7}
+    assert portal._connect_args('mysql+pymysql://u:p@host/db') == {'connect_timeout': 7}
+    assert portal._connect_args('sqlite:///x.db') == {}
+
+
+def test_pool_warmer_starts_once_under_concurrent_requests(monkeypatch):
+    import threading
+    started = []
+    monkeypatch.setattr(portal, 'POOL_WARM_MIN', 1)
+    monkeypatch.setattr(portal, '_WARMER_PID', None)
+    monkeypatch.setattr(portal, '_pool_warmer_loop', lambda: started.append(1))
+    threads = [threading.Thread(target=portal._start_pool_warmer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for t in threading.enumerate():
+        if t.name == 'pool-warmer':
+            t.join(1)
+    assert started == [1]
+
+
+def test_connect_is_measured_outside_a_warm_pool(logs_source, monkeypatch):
+    info = portal.current_config().db_config['selection_test']
+    portal._warm_source('selection_test', info, 2)
+    connects = []
+    probe = portal._probe_engine(info['connection_string'])
+    from sqlalchemy import event
+    event.listen(probe, 'connect', lambda dbapi_conn, record: connects.append(1))
+    report = portal._health_report(force=True)
+    assert report['sources']['selection_test']['status'] == 'ok'
+    assert connects == [1]
+    # The pooled engine still serves the SELECT from its warm pool
+    assert portal._get_engine(info['connection_string']).pool.checkedin() == 2
+
+
+def test_degraded_report_returns_503(monkeypatch):
+    add_sources(monkeypatch, broken={
+        'display_name': 'Broken',
+        'connection_string': 'sqlite:////nonexistent/dir/secret.db',
+    })
+    resp = portal.app.test_client().get('/healthz?refresh=1')
+    assert resp.status_code == 503
+    assert resp.get_json()['status'] == 'degraded'
@@ -0,0 +1,24 @@
+"""
+Tests for the /query and /export routes against a temporary SQLite source.
+"""
+import io
+import zipfile
+
+import app as portal
+
+
+def test_query_renders_rows(logs_source):
+    resp = portal.app.test_client().post('/query', data={'application': 'Selection Test', 'time_span': '180', 'limit': '500'})
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 200
+    assert body.count('class="row-select"') == 120
+    assert 'value="1"' in body
+    assert 'class="level-error"' in body
+    assert '&lt;b&gt;payload 7&lt;/b&gt;' in body
+
+
+def test_export_writes_xlsx(logs_source):
+    resp = portal.app.test_client().post('/export', data={'application': 'Selection Test', 'time_span': '180', 'limit': '500'})
+    assert resp.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(resp.data)) as zf:
+        assert 'xl/worksheets/sheet1.xml' in zf.namelist()
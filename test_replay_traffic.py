@@ -0,0 +1,87 @@
+"""
+Tests for replay_traffic.py: trace extraction from app.log lines and replay reporting.
+"""
+import time
+
+import app as portal
+from replay_traffic import extract_trace, percentile, replay
+
+LOG_LINES = [
+    "2025-09-13 19:52:38,498 INFO root REQ start 10.0.0.7 POST /query params={} form={'application': 'Selection Test', 'jsession_id': 'ABC123', 'time_span': '180', 'limit': '50'}\n",
+    "2025-09-13 19:52:38,499 INFO root API Request: app_name=Selection Test, jsession_id=ABC123, time_span=180, limit=50\n",
+    "2025-09-13 19:52:38,606 INFO root REQ start 10.0.0.7 GET /static/css/styles.css params={} form={}\n",
+    "2025-09-13 19:52:38,661 INFO root REQ done 10.0.0.7 GET /static/css/styles.css status=304 duration_ms=54\n",
+    "2025-09-13 19:52:38,568 INFO root REQ done 10.0.0.7 POST /query status=200 duration_ms=73\n",
+    "2025-09-13 19:52:39,000 INFO root REQ start 10.0.0.8 POST /send_selected_logs params={} form={}\n",
+    "2025-09-13 19:52:40,000 INFO root REQ start 10.0.0.8 GET /healthz params={'token': 'secret'} form={}\n",
+    "2025-09-13 19:52:40,010 INFO root REQ done 10.0.0.8 GET /healthz status=200 duration_ms=10\n",
+]
+
+
+def test_extract_pairs_redacts_and_skips():
+    trace = extract_trace(LOG_LINES)
+    assert [(r['method'], r['path']) for r in trace] == [('POST', '/query'), ('GET', '/healthz')]
+    query, health = trace
+    assert query['form']['jsession_id'] == '' and query['form']['limit'] == '50'
+    assert query['status'] == 200 and query['duration_ms'] == 73
+    assert health['offset_s'] == 1.502
+    assert health['params'] == {'token': ''}
+    assert '10.0.0.7' not in str(trace)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([5, 7], 50) == 5
+    assert percentile([], 50) is None
+
+
+def test_replay_reports_per_endpoint(logs_source):
+    client = portal.app.test_client()
+
+    def send(record):
+        return client.open(record['path'], method=record['method'], data=record.get('form') or None).status_code
+
+    trace = extract_trace(LOG_LINES) * 3
+    report = replay(trace, send, concurrency=1, speedup=0)
+    assert report['requests'] == 6 and report['errors'] == 0
+    stats = report['endpoints']['POST /query']
+    assert stats['count'] == 3
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+
+
+def test_queueing_counts_against_latency_when_saturated():
+    # 6 requests scheduled 10 ms apart, each taking 50 ms, on one worker: the later ones wait
+    trace = [{'offset_s': i * 0.01, 'method': 'GET', 'path': '/slow'} for i in range(6)]
+
+    def send(record):
+        time.sleep(0.05)
+        return 200
+
+    stats = replay(trace, send, concurrency=1, speedup=1)['endpoints']['GET /slow']
+    # The last request is sent ~250 ms after its slot; service time alone would be ~50 ms
+    assert stats['p99_ms'] >= 200
+    assert stats['queue_max_ms'] >= 180
+
+
+def test_standins_stay_pinned_across_reloads(tmp_path, monkeypatch):
+    from replay_traffic import _use_sqlite_standins
+    monkeypatch.setattr(portal, '_CONFIG', portal._CONFIG)
+    monkeypatch.setattr(portal, 'refresh_config', portal.refresh_config)
+    monkeypatch.setattr(portal, 'CONFIG_VERSION_PATH', str(tmp_path / '.config_version'))
+    monkeypatch.setattr(portal, 'CONFIG_CHECK_INTERVAL', 0)
+    (tmp_path / 'fe_pd.db').write_bytes(b'')
+    standins = _use_sqlite_standins(portal, str(tmp_path))
+    client = portal.app.test_client()
+
+    def send(record):
+        portal.bump_config_version()  # a reload lands mid-replay
+        status = client.open(record['path'], method=record['method']).status_code
+        assert portal.current_config() is standins
+        return status
+
+    report = replay([{'offset_s': 0, 'method': 'GET', 'path': '/'}] * 3, send, concurrency=1, speedup=0)
+    assert report['errors'] == 0
+    assert portal.refresh_config(force=True) is standins
+    assert set(portal.current_config().db_config) == {'fe_pd'}
@@ -0,0 +1,66 @@
+"""
+Tests for response compression, streamed result pages and hashed static URLs.
+"""
+import gzip
+
+import pytest
+from flask import url_for
+
+import app as portal
+
+
+def _query(logs_source, **headers):
+    return portal.app.test_client().post('/query', headers=headers,
+                                         data={'application': 'Selection Test', 'time_span': '180', 'limit': '500'})
+
+
+def test_large_result_page_is_streamed_and_gzipped(logs_source, monkeypatch):
+    monkeypatch.setattr(portal, 'STREAM_MIN_ROWS', 100)
+    resp = _query(logs_source, **{'Accept-Encoding': 'gzip'})
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resp.headers
+    assert 'Accept-Encoding' in resp.headers['Vary']
+    body = gzip.decompress(resp.get_data()).decode('utf-8')
+    assert body.count('class="row-select"') == 120
+    assert body.rstrip().endswith('</html>')
+
+
+def test_identity_without_accept_encoding(logs_source):
+    resp = _query(logs_source)
+    assert 'Content-Encoding' not in resp.headers
+    assert resp.get_data(as_text=True).count('class="row-select"') == 120
+
+
+def test_small_responses_are_not_compressed():
+    resp = portal.app.test_client().post('/send_selected_logs', json=[], headers={'Accept-Encoding': 'gzip'})
+    assert len(resp.get_data()) < portal.COMPRESS_MIN_BYTES
+    assert 'Content-Encoding' not in resp.headers
+
+
+def test_brotli_preferred_when_available(logs_source):
+    brotli = pytest.importorskip('brotli')
+    resp = _query(logs_source, **{'Accept-Encoding': 'gzip, br'})
+    assert resp.headers['Content-Encoding'] == 'br'
+    assert int(resp.headers['X-Uncompressed-Length']) > len(resp.get_data())
+    assert brotli.decompress(resp.get_data()).decode('utf-8').count('class="row-select"') == 120
+
+
+def test_static_urls_are_content_hashed_and_immutable():
+    with portal.app.test_request_context():
+        url = url_for('static', filename='css/styles.css')
+    assert '?v=' in url
+    resp = portal.app.test_client().get(url)
+    assert resp.status_code == 200
+    assert resp.cache_control.immutable
+    assert resp.cache_control.max_age == portal.STATIC_MAX_AGE
+    resp.close()
+
+
+def test_wrong_static_hash_is_not_cached_immutably():
+    resp = portal.app.test_client().get('/static/css/styles.css?v=deadbeef0000')
+    assert resp.status_code == 200
+    assert not resp.cache_control.immutable
+    assert resp.cache_control.max_age != portal.STATIC_MAX_AGE
+    resp.close()
@@ -0,0 +1,63 @@
+"""
+Tests for resultset.py: the compact result container and its export/email writers.
+"""
+import gzip
+import io
+import sqlite3
+import zipfile
+
+from sqlalchemy import create_engine, text
+
+from resultset import ResultSet, to_csv_gzip, to_html_table, to_xlsx_bytes, write_xlsx
+
+
+def _sample():
+    return ResultSet(('id', 'level', 'message'), [(1, 'ERROR', 'a' * 50), (2, 'INFO', '<b>x</b>'), (3, None, None)])
+
+
+def test_from_cursor_stores_plain_tuples():
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        conn.execute(text('CREATE TABLE t (id INTEGER, msg TEXT)'))
+        conn.execute(text("INSERT INTO t VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+        rs = ResultSet.from_cursor(conn.execute(text('SELECT * FROM t ORDER BY id')), max_rows=2)
+    assert rs.columns == ('id', 'msg')
+    assert rs.rows == [(1, 'a'), (2, 'b')]
+    assert all(type(r) is tuple for r in rs.rows)
+
+
+def test_index_filter_and_previews():
+    rs = _sample()
+    assert rs.index('level') == 1 and rs.index('missing') is None
+    assert len(rs.filter(lambda r: r[0] > 1)) == 2
+    preview = list(rs.previews(10))
+    assert preview[0][2] == 'a' * 10 + '…'
+    assert list(rs.previews(0)) == rs.rows
+
+
+def test_from_records_keeps_column_order():
+    rs = ResultSet.from_records([{'id': 1, 'msg': 'a'}, {'id': 2, 'extra': 'x'}])
+    assert rs.columns == ('id', 'msg', 'extra')
+    assert rs.rows == [(1, 'a', None), (2, None, 'x')]
+
+
+def test_writers():
+    rs = _sample()
+    csv_text = gzip.decompress(to_csv_gzip(rs)).decode('utf-8')
+    assert csv_text.splitlines()[0] == 'id,level,message'
+    assert len(csv_text.splitlines()) == 4
+    assert '&lt;b&gt;x&lt;/b&gt;' in to_html_table(rs)
+    with zipfile.ZipFile(io.BytesIO(to_xlsx_bytes(rs))) as zf:
+        assert 'xl/worksheets/sheet1.xml' in zf.namelist()
+
+
+def test_xlsx_is_written_in_constant_memory_mode(tmp_path, monkeypatch):
+    import xlsxwriter
+    modes = []
+    close = xlsxwriter.Workbook.close
+    monkeypatch.setattr(xlsxwriter.Workbook, 'close', lambda wb: modes.append(wb.constant_memory) or close(wb))
+    path = tmp_path / 'out.xlsx'
+    write_xlsx(_sample(), str(path))
+    assert modes == [True]
+    with zipfile.ZipFile(path) as zf:
+        assert 'xl/worksheets/sheet1.xml' in zf.namelist()
@@ -0,0 +1,87 @@
+"""
+Tests for /send_selected_logs: rows are re-fetched server-side from ids + query context.
+"""
+import gzip
+
+import pytest
+
+import app as portal
+
+
+@pytest.fixture
+def source(logs_source, monkeypatch):
+    sent = []
+    monkeypatch.setattr(portal, 'send_logs_via_email', lambda to, rs, app_name=None, attachment=None: sent.append((rs, attachment)))
+    return logs_source, sent
+
+
+def test_small_selection_is_refetched_by_id(source):
+    context, sent = source
+    resp = portal.app.test_client().post('/send_selected_logs', json={'ids': ['3', '5'], 'context': context, 'email': 'ops@example.com'})
+    assert resp.status_code == 200, resp.get_json()
+    rs, attachment = sent[0]
+    assert sorted(rs.column('id')) == [3, 5]
+    assert attachment is None
+
+
+def test_large_selection_goes_out_as_gzip_csv(source):
+    context, sent = source
+    ids = [str(i) for i in range(1, 101)]
+    resp = portal.app.test_client().post('/send_selected_logs', json={'ids': ids, 'context': context, 'email': 'ops@example.com'})
+    assert resp.get_json()['attached'] is True
+    filename, _, _, payload = sent[0][1]
+    assert filename == 'selected_logs.csv.gz'
+    assert gzip.decompress(payload).decode('utf-8').count('\n') == 101
+
+
+def test_attachment_size_cap(source, monkeypatch):
+    context, sent = source
+    monkeypatch.setattr(portal, 'EMAIL_ATTACHMENT_MAX_BYTES', 10)
+    ids = [str(i) for i in range(1, 101)]
+    resp = portal.app.test_client().post('/send_selected_logs', json={'ids': ids, 'context': context, 'email': 'ops@example.com'})
+    assert resp.status_code == 413
+    assert not sent
+
+
+@pytest.mark.parametrize('payload', [
+    {'ids': ['1'], 'context': 'x', 'email': 'ops@example.com'},
+    {'ids': 'abc', 'context': {}, 'email': 'ops@example.com'},
+    {'ids': 5, 'email': 'ops@example.com'},
+    {'rows': ['not a row'], 'email': 'ops@example.com'},
+    {'rows': [{'id': 1}], 'email': ['ops@example.com']},
+    ['not', 'an', 'object'],
+])
+def test_malformed_payloads_are_rejected(source, payload):
+    context, sent = source
+    resp = portal.app.test_client().post('/send_selected_logs', json=payload)
+    assert resp.status_code == 400
+    assert not sent
+
+
+def test_refetch_is_capped(source, monkeypatch):
+    context, sent = source
+    limits = []
+    query_logs = portal.query_logs
+    monkeypatch.setattr(portal, 'query_logs', lambda *a: limits.append(a[-1]) or query_logs(*a))
+    monkeypatch.setattr(portal, 'EMAIL_MAX_SELECTED_ROWS', 20)
+    resp = portal.app.test_client().post('/send_selected_logs', json={'ids': ['3'], 'context': dict(context, limit=500), 'email': 'ops@example.com'})
+    assert resp.status_code == 200
+    assert limits == [20]
+
+
+def test_configured_id_column_matches_normalized_case():
+    # Oracle result keys come back lower-cased even when db_config.json names SC_ID
+    columns = ('sc_id', 'audit_timestamp', 'id')
+    assert portal._row_id_column(columns, {'id_column': 'SC_ID'}) == 'sc_id'
+    assert portal._row_id_column(('SC_ID', 'ID'), {'id_column': 'sc_id'}) == 'SC_ID'
+    assert portal._row_id_column(columns, {'id_column': 'missing'}) == 'id'
+    assert portal._row_id_column(('a', 'b'), {}) is None
+
+
+def test_missing_ids_are_reported(source):
+    context, sent = source
+    resp = portal.app.test_client().post('/send_selected_logs', json={'ids': ['3', '9999', '5'], 'context': context, 'email': 'ops@example.com'})
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body['rows'] == 2 and body['missing'] == ['9999']
+    assert sorted(sent[0][0].column('id')) == [3, 5]
@@ -0,0 +1,134 @@
+"""
+Tests for adaptive time-sliced execution in query_logs().
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import app as portal
+from conftest import add_sources
+
+
+@pytest.fixture
+def week_source(tmp_path, monkeypatch):
+    """One row per minute for the last 7 days; returns (now, list of executed start_time binds)."""
+    db_path = tmp_path / 'week.db'
+    now = datetime.utcnow().replace(microsecond=0)
+    con = sqlite3.connect(db_path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT, level TEXT)')
+    con.executemany('INSERT INTO logs VALUES (?, ?, ?)',
+                    [(i, (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'), 'ERROR') for i in range(10080)])
+    con.commit()
+    con.close()
+    uri = f'sqlite:///{db_path}'
+    add_sources(monkeypatch, week={
+        'display_name': 'Week',
+        'connection_string': uri,
+        'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY event_time DESC',
+    })
+    starts = []
+    event.listen(portal._get_engine(uri), 'before_cursor_execute',
+                 lambda conn, cursor, stmt, params, ctx, many: stmt.startswith('SELECT * FROM logs') and starts.append(params))
+    return now, starts
+
+
+def _unsliced(now, limit):
+    return [(i, (now - timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'), 'ERROR') for i in range(limit)]
+
+
+def test_latest_rows_touch_only_recent_slices(week_source):
+    now, executed = week_source
+    rs = portal.query_logs('Week', None, now - timedelta(days=7), now, 500)
+    assert rs.rows == _unsliced(now, 500)
+    # 500 rows at 1/min need ~8.3 hours; the whole week must not have been scanned
+    earliest = min(datetime.strptime(p[0], '%Y-%m-%d %H:%M:%S') for p in executed)
+    assert len(executed) < 10
+    assert now - earliest < timedelta(hours=24)
+
+
+def test_sliced_matches_full_scan_without_duplicates(week_source, monkeypatch):
+    now, _ = week_source
+    monkeypatch.setattr(portal, 'QUERY_SLICE_INITIAL_MINUTES', 7)
+    rs = portal.query_logs('Week', None, now - timedelta(days=7), now, 20000)
+    assert len(rs) == 10080
+    assert rs.rows == _unsliced(now, 10080)
+
+
+def test_parallel_slices(week_source, monkeypatch):
+    now, _ = week_source
+    monkeypatch.setattr(portal, 'QUERY_SLICE_PARALLEL', 3)
+    rs = portal.query_logs('Week', None, now - timedelta(days=7), now, 2000)
+    assert rs.rows == _unsliced(now, 2000)
+
+
+def test_small_window_runs_once(week_source):
+    now, executed = week_source
+    rs = portal.query_logs('Week', None, now - timedelta(hours=2), now, 50)
+    assert len(rs) == 50 and len(executed) == 1
+
+
+def test_non_time_order_is_not_sliced(tmp_path, monkeypatch):
+    """ORDER BY id DESC with ids that do not follow event_time must keep the configured order."""
+    db_path = tmp_path / 'by_id.db'
+    now = datetime.utcnow().replace(microsecond=0)
+    con = sqlite3.connect(db_path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT)')
+    con.executemany('INSERT INTO logs VALUES (?, ?)',
+                    [(i, (now - timedelta(minutes=(i * 37) % 10000)).strftime('%Y-%m-%d %H:%M:%S')) for i in range(3000)])
+    con.commit()
+    con.close()
+    add_sources(monkeypatch, by_id={
+        'display_name': 'By Id',
+        'connection_string': f'sqlite:///{db_path}',
+        'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY id DESC',
+    })
+    rs = portal.query_logs('By Id', None, now - timedelta(days=7), now, 100)
+    assert [r[0] for r in rs.rows] == list(range(2999, 2899, -1))
+
+
+def test_identical_rows_without_id_column_are_kept(tmp_path, monkeypatch):
+    db_path = tmp_path / 'no_id.db'
+    now = datetime.utcnow().replace(microsecond=0)
+    ts = (now - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+    con = sqlite3.connect(db_path)
+    con.execute('CREATE TABLE logs (event_time TEXT, message TEXT)')
+    con.executemany('INSERT INTO logs VALUES (?, ?)', [(ts, 'timeout')] * 5)
+    con.commit()
+    con.close()
+    add_sources(monkeypatch, no_id={
+        'display_name': 'No Id',
+        'connection_string': f'sqlite:///{db_path}',
+        'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY event_time DESC',
+    })
+    rs = portal.query_logs('No Id', None, now - timedelta(days=2), now, 100)
+    assert rs.rows == [(ts, 'timeout')] * 5
+
+
+def test_opt_in_slices_id_ordered_query(tmp_path, monkeypatch):
+    """`"time_slicing": true` slices by event_time and keeps ORDER BY id DESC within each slice."""
+    db_path = tmp_path / 'seq.db'
+    now = datetime.utcnow().replace(microsecond=0)
+    con = sqlite3.connect(db_path)
+    con.execute('CREATE TABLE logs (id INTEGER PRIMARY KEY, event_time TEXT)')
+    # ids follow time, several rows share each second
+    con.executemany('INSERT INTO logs VALUES (?, ?)',
+                    [(10080 * 3 - i, (now - timedelta(minutes=i // 3)).strftime('%Y-%m-%d %H:%M:%S')) for i in range(10080 * 3)])
+    con.commit()
+    con.close()
+    uri = f'sqlite:///{db_path}'
+    add_sources(monkeypatch, seq={
+        'display_name': 'Seq',
+        'connection_string': uri,
+        'select_query': 'SELECT * FROM logs WHERE event_time BETWEEN :start_time AND :end_time ORDER BY id DESC',
+        'time_slicing': True,
+    })
+    starts = []
+    event.listen(portal._get_engine(uri), 'before_cursor_execute',
+                 lambda conn, cursor, stmt, params, ctx, many: stmt.startswith('SELECT * FROM logs') and starts.append(params))
+    rs = portal.query_logs('Seq', None, now - timedelta(days=7), now, 500)
+    assert [r[0] for r in rs.rows] == list(range(10080 * 3, 10080 * 3 - 500, -1))
+    assert len(starts) > 1
+    earliest = min(datetime.strptime(p[0], '%Y-%m-%d %H:%M:%S') for p in starts)
+    assert now - earliest < timedelta(hours=24)